@@ -0,0 +1,326 @@
+# Benchmarks for the schedule loading, sorting and filtering logic
+# usage: python benchmark.py [name ...]
+import os
+import sys
+import csv
+import time
+import random
+import shutil
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+import timetable_viewer
+from timetable_viewer import ScheduleHandler, ScheduleController, Schedule, Sorter, Filter
+
+HEADERS = ["Activity", "Name", "Description", "Activity date", "Scheduled Day", "Scheduled Start Time", "Scheduled End Time", "Duration", "Allocated Location Name", "Planned Size", "Allocated Staff Name", "Zone Name"]
+
+def makeDataset(directoryPath, files, rows, seed=0):
+    # cohort files shaped like the term exports, with realistic value repetition
+    random.seed(seed)
+    start_date = datetime(2024, 1, 8)
+    lecturers = [f"Lecturer {i}" for i in range(120)]
+    locations = [f"Room {i}" for i in range(80)]
+    for file_index in range(files):
+        cohort = f"COHORT{file_index % 40}_{2024 + file_index % 3}"
+        with open(os.path.join(directoryPath, f"cohort_{file_index:04}.csv"), "w", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(HEADERS)
+            for row in range(rows):
+                date = start_date + timedelta(days=random.randint(0, 250))
+                start_time = datetime(1900, 1, 1, random.randint(8, 17), random.choice([0, 30]))
+                hours = random.randint(1, 3)
+                module = f"MOD{random.randint(100, 400)}"
+                writer.writerow([
+                    row,
+                    f"{cohort}_{random.choice(['FT', 'PT'])}_{module}_{random.choice(['Lecture', 'Tutorial', 'Lab'])}",
+                    f"Module {module} (Sem 1)",
+                    date.strftime('%d/%m/%Y'),
+                    date.strftime('%A'),
+                    start_time.strftime('%H:%M:%S'),
+                    (start_time + timedelta(hours=hours)).strftime('%H:%M:%S'),
+                    f"{hours:02}:00",
+                    random.choice(locations),
+                    random.choice([20, 30, 40, 60, 120]),
+                    random.choice(lecturers),
+                    random.choice(["Zone A", "Zone B", "Zone C"]),
+                ])
+
+def makeSchedules(count, seed=0):
+    # Schedule objects straight from generated fields, for benchmarks that do not need files
+    random.seed(seed)
+    start_date = datetime(2024, 1, 8)
+    schedules = []
+    for _ in range(count):
+        date = start_date + timedelta(days=random.randint(0, 250))
+        start_time = datetime(1900, 1, 1, random.randint(8, 17), random.choice([0, 30]))
+        hours = random.randint(1, 3)
+        module = f"MOD{random.randint(100, 400)}"
+        schedules.append(Schedule(
+            f"COHORT{random.randint(0, 39)}_2024_{random.choice(['FT', 'PT'])}_{module}_{random.choice(['Lecture', 'Tutorial', 'Lab'])}",
+            f"Module {module} (Sem 1)",
+            date.strftime('%d/%m/%Y'),
+            date.strftime('%A'),
+            start_time.strftime('%H:%M:%S'),
+            (start_time + timedelta(hours=hours)).strftime('%H:%M:%S'),
+            f"{hours:02}:00",
+            f"Room {random.randint(0, 79)}",
+            str(random.choice([20, 30, 40, 60, 120])),
+            f"Lecturer {random.randint(0, 119)}",
+            random.choice(["Zone A", "Zone B", "Zone C"]),
+        ))
+    return schedules
+
+class ListHandler:
+    # what ScheduleController needs from a ScheduleHandler, over schedules that are already built
+    def __init__(self, schedules):
+        self.__schedules = schedules
+
+    def getSchedules(self):
+        return self.__schedules
+
+    def getVersion(self):
+        return 0
+
+def clearParseCaches():
+    for function in [timetable_viewer.parseDate, timetable_viewer.parseTime, timetable_viewer.parseDuration, timetable_viewer.parseWeekday, timetable_viewer.parseSize]:
+        function.cache_clear()
+
+def measure(function, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best == None or elapsed < best:
+            best = elapsed
+    return best
+
+def benchmarkSnapshot(files=200, rows=500):
+    workDirectory = tempfile.mkdtemp()
+    try:
+        directoryPath = os.path.join(workDirectory, "data") + "/"
+        cacheDirectory = os.path.join(workDirectory, "cache")
+        os.makedirs(directoryPath)
+        makeDataset(directoryPath, files, rows)
+
+        def cold():
+            shutil.rmtree(cacheDirectory, ignore_errors=True)
+            ScheduleHandler(cacheDirectory=cacheDirectory).loadDirectory(directoryPath)
+
+        def warm():
+            ScheduleHandler(cacheDirectory=cacheDirectory).loadDirectory(directoryPath)
+
+        cold_time = measure(cold)
+        warm_time = measure(warm)
+        print(f"snapshot: {files*rows} rows, cold parse {cold_time:.3f}s, warm snapshot {warm_time:.3f}s ({cold_time/warm_time:.1f}x)")
+    finally:
+        shutil.rmtree(workDirectory, ignore_errors=True)
+
+def benchmarkParseCache(files=200, rows=500):
+    workDirectory = tempfile.mkdtemp()
+    parsers = ["parseDate", "parseTime", "parseDuration", "parseWeekday"]
+    cached = {name: getattr(timetable_viewer, name) for name in parsers}
+    try:
+        directoryPath = workDirectory + "/"
+        makeDataset(directoryPath, files, rows)
+
+        def load():
+            for function in cached.values():
+                function.cache_clear()
+            ScheduleHandler().loadDirectory(directoryPath)
+
+        cached_time = measure(load)
+        for name, function in cached.items():
+            setattr(timetable_viewer, name, function.__wrapped__)
+        uncached_time = measure(load)
+        print(f"parse cache: {files*rows} rows, uncached {uncached_time:.3f}s, cached {cached_time:.3f}s ({uncached_time/cached_time:.1f}x)")
+    finally:
+        for name, function in cached.items():
+            setattr(timetable_viewer, name, function)
+        shutil.rmtree(workDirectory, ignore_errors=True)
+
+def benchmarkMemory(files=200, rows=500):
+    workDirectory = tempfile.mkdtemp()
+    try:
+        directoryPath = workDirectory + "/"
+        makeDataset(directoryPath, files, rows)
+        handler = ScheduleHandler()
+        handler.loadDirectory(directoryPath)
+        # measure a second load so the shared parse caches and interned strings are already warm
+        tracemalloc.start()
+        handler = ScheduleHandler()
+        handler.loadDirectory(directoryPath)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"memory: {len(handler.getSchedules())} rows, {size/len(handler.getSchedules()):.0f} bytes per row")
+    finally:
+        shutil.rmtree(workDirectory, ignore_errors=True)
+
+def benchmarkLazy(files=200, rows=500):
+    workDirectory = tempfile.mkdtemp()
+    try:
+        directoryPath = workDirectory + "/"
+        makeDataset(directoryPath, files, rows)
+        for lazy in [False, True]:
+            handler = ScheduleHandler(lazy=lazy)
+            clearParseCaches()
+            start = time.perf_counter()
+            handler.loadDirectory(directoryPath)
+            load_time = time.perf_counter() - start
+            access_time = measure(lambda: [(schedule.getItem("Cohort"), schedule.getItem("Module_Code"), schedule.getItem("Date")) for schedule in handler.getSchedules()], repeat=1)
+            print(f"lazy={lazy}: {files*rows} rows, load {load_time:.3f}s, cohort/module/date access {access_time:.3f}s")
+    finally:
+        shutil.rmtree(workDirectory, ignore_errors=True)
+
+def benchmarkWorkers(files=500, rows=200):
+    workDirectory = tempfile.mkdtemp()
+    try:
+        directoryPath = workDirectory + "/"
+        makeDataset(directoryPath, files, rows)
+        serial_time = None
+        for workers in sorted({1, 2, os.cpu_count() or 1}):
+            load_time = measure(lambda: ScheduleHandler(workers=workers).loadDirectory(directoryPath))
+            if serial_time == None:
+                serial_time = load_time
+            print(f"workers={workers}: {files} files, {files*rows} rows, load {load_time:.3f}s ({serial_time/load_time:.2f}x), {os.cpu_count()} cpus")
+    finally:
+        shutil.rmtree(workDirectory, ignore_errors=True)
+
+def benchmarkSort(sizes=(10000, 100000, 1000000)):
+    heap = Sorter()
+    heap.setEngine("heap")
+    key = Sorter()
+    for size in sizes:
+        schedules = makeSchedules(size)
+        heap_time = measure(lambda: heap.sort(schedules, "Lecturer"), repeat=1)
+        key_time = measure(lambda: key.sort(schedules, "Lecturer"))
+        print(f"sort: {size} rows by Lecturer, heap {heap_time:.3f}s, key {key_time:.3f}s ({heap_time/key_time:.1f}x)")
+
+def benchmarkTopK(sizes=(100000, 1000000), top=200):
+    keys = [("Date", True), ("Start_Time", False), ("Lecturer", False)]
+    for size in sizes:
+        schedules = makeSchedules(size)
+        controller = ScheduleController(ListHandler(schedules))
+        # the first run builds the per-column keys, time the sorts after that
+        controller.sortProcessedBy(keys)
+        full_time = measure(lambda: (controller.sortProcessedBy(keys), controller.getProcessed()))
+        top_time = measure(lambda: (controller.sortProcessedBy(keys, top=top), controller.getProcessed(top)))
+        print(f"top_k: {size} rows by Date/Start_Time/Lecturer, full sort {full_time:.3f}s, first {top} rows {top_time:.3f}s ({full_time/top_time:.1f}x)")
+
+def benchmarkFilter(sizes=(100000, 1000000)):
+    query = {"Zone": "Zone A", "Lecturer": "Lecturer 5&&&Lecturer 7&&&Lecturer 11", "Day_str": "Monday&&&Wednesday", "Class_Type": "Lab"}
+    for size in sizes:
+        schedules = makeSchedules(size)
+        # no result cache, and a reset before each run so the repeat is not answered as a refinement either
+        controller = ScheduleController(ListHandler(schedules), cacheLimit=0)
+        cold_time = measure(lambda: controller.control(sortBy="Date", **query), repeat=1)
+        warm_time = measure(lambda: (controller.resetProcessed(), controller.control(sortBy="Date", **query)))
+        print(f"filter: {size} rows, {len(query)} categorical filters, first query {cold_time:.3f}s, repeated {warm_time*1000:.1f}ms, {controller.getProcessedCount()} rows found")
+
+def benchmarkFreeRooms(size=200000):
+    schedules = makeSchedules(size)
+    controller = ScheduleController(ListHandler(schedules))
+    week = (datetime(2024, 3, 4), datetime(2024, 3, 8), datetime(1900, 1, 1, 7, 0), datetime(1900, 1, 1, 8, 30))
+    build_time = measure(lambda: controller.getFreeRooms(*week), repeat=1)
+    rooms_time = measure(lambda: controller.getFreeRooms(*week, size=40))
+    slots_time = measure(lambda: controller.getFreeSlots("Lecturer 3", datetime(2024, 1, 1), datetime(2024, 12, 31), datetime(1900, 1, 1, 9, 0), datetime(1900, 1, 1, 17, 0), duration=timedelta(hours=1)))
+    print(f"free_rooms: {size} rows, first query {build_time:.3f}s, free rooms for a week {rooms_time*1000:.1f}ms, a lecturer's free slots for a year {slots_time*1000:.1f}ms")
+
+def benchmarkFacets(sizes=(100000, 1000000)):
+    def facets():
+        for variable in timetable_viewer.FACET_COLUMNS:
+            controller.getValuesSet(variable)
+        controller.getModuleSet()
+    for size in sizes:
+        schedules = makeSchedules(size)
+        controller = ScheduleController(ListHandler(schedules))
+        first_time = measure(facets, repeat=1)
+        controller.control(sortBy="Date", Zone="Zone A")
+        filtered_time = measure(facets, repeat=1)
+        cached_time = measure(facets)
+        print(f"facets: {size} rows, {len(timetable_viewer.FACET_COLUMNS)} filter options, first {first_time:.3f}s, after a filter {filtered_time:.3f}s, cached {cached_time*1000:.2f}ms")
+
+def benchmarkQueryCache(size=1000000):
+    schedules = makeSchedules(size)
+    queries = [{"Zone": "Zone A", "Start_Date": datetime(2024, 3, 1), "Size": 40}, {"Lecturer": "Lecturer 5&&&Lecturer 9", "Time_Window": (datetime(1900, 1, 1, 10, 30), datetime(1900, 1, 1, 12, 0))}, {"Day_str": "Monday", "End_Date": datetime(2024, 5, 1)}]
+    def run(controller):
+        for query in queries:
+            controller.control(sortBy="Date", top=200, **query)
+    uncached = ScheduleController(ListHandler(schedules), cacheLimit=0)
+    cached = ScheduleController(ListHandler(schedules))
+    run(uncached)
+    run(cached)
+    uncached_time = measure(lambda: run(uncached))
+    cached_time = measure(lambda: run(cached))
+    stats = cached.getCacheStats()
+    print(f"query_cache: {size} rows, {len(queries)} repeated queries, uncached {uncached_time*1000:.1f}ms, cached {cached_time*1000:.1f}ms ({uncached_time/cached_time:.1f}x), {stats['hits']} hits {stats['misses']} misses {stats['bytes']} bytes")
+
+def benchmarkSearch(size=1000000):
+    schedules = makeSchedules(size)
+    controller = ScheduleController(ListHandler(schedules), cacheLimit=0)
+    build_time = measure(lambda: controller.search("m"), repeat=1)
+    # what a user types, one keystroke at a time
+    keystrokes = ["m", "mo", "mod", "mod1", "mod12", "mod123"]
+    search_time = max(measure(lambda: controller.search(text)) for text in keystrokes)
+    filter_time = measure(lambda: (controller.resetProcessed(), controller.control(sortBy="Date", top=200, Search="room 7")))
+    print(f"search: {size} rows, first search {build_time:.3f}s, slowest keystroke {search_time*1000:.2f}ms, Search filter {filter_time*1000:.1f}ms")
+    # what the search box runs: the description list on every keystroke, the facet counts of all options once typing pauses
+    # with the default cache, as in the App, so the counts share one search per text
+    controller = ScheduleController(ListHandler(schedules))
+    facets = ["Cohort", "Study_Mode", "Lecturer", "Module_Code", "Location", "Zone", "Description", "Day_str", "Class_Type"]
+    for facet in facets:
+        controller.getFacetCounts(facet)
+    controller.search("m")
+    def recount(text):
+        for facet in facets:
+            controller.getFacetCounts(facet, Search=text)
+    listbox_time = max(measure(lambda: controller.search(text, limit=None, columns=["Description"]), repeat=1) for text in keystrokes)
+    counts_time = max(measure(lambda: recount(text), repeat=1) for text in keystrokes)
+    print(f"search: {size} rows, slowest keystroke refilling the description list {listbox_time*1000:.1f}ms, slowest recount of {len(facets)} facets {counts_time*1000:.0f}ms")
+
+def benchmarkColumnar(sizes=(100000, 1000000)):
+    if timetable_viewer.numpy == None:
+        print("columnar: numpy is not installed, skipped")
+        return
+    obj = Filter()
+    columnar = Filter()
+    columnar.setEngine("numpy")
+    for size in sizes:
+        schedules = makeSchedules(size)
+        lecturers = "&&&".join(sorted({schedule.getItem("Lecturer") for schedule in schedules[:1000]})[:3])
+        start_date = schedules[size//2].getItem("Date")
+        # the first numpy sort builds the typed columns
+        build_time = measure(lambda: (columnar.sort(schedules, "Lecturer"), columnar.sort(schedules, "Date")), repeat=1)
+        print(f"columnar: {size} rows, building the Lecturer and Date columns {build_time:.3f}s")
+        for name, function in [
+            ("sort by Lecturer", lambda sorter: sorter.sort(schedules, "Lecturer")),
+            ("sort by Date descending", lambda sorter: sorter.sort(schedules, "Date", descending=True)),
+            ("first 200 by Date descending", lambda sorter: sorter.sortTop(schedules, "Date", 200, descending=True)),
+            ("filter 3 lecturers", lambda sorter: sorter.filter(schedules, "Lecturer", lecturers)),
+            ("filter Start_Date", lambda sorter: sorter.filter(schedules, "Start_Date", start_date)),
+        ]:
+            assert function(obj) == function(columnar)
+            object_time = measure(lambda: function(obj), repeat=1)
+            columnar_time = measure(lambda: function(columnar))
+            print(f"columnar: {size} rows, {name}, object {object_time:.3f}s, numpy {columnar_time:.3f}s ({object_time/columnar_time:.1f}x)")
+
+BENCHMARKS = {
+    "snapshot": benchmarkSnapshot,
+    "parse_cache": benchmarkParseCache,
+    "memory": benchmarkMemory,
+    "lazy": benchmarkLazy,
+    "workers": benchmarkWorkers,
+    "sort": benchmarkSort,
+    "top_k": benchmarkTopK,
+    "filter": benchmarkFilter,
+    "free_rooms": benchmarkFreeRooms,
+    "facets": benchmarkFacets,
+    "query_cache": benchmarkQueryCache,
+    "search": benchmarkSearch,
+    "columnar": benchmarkColumnar,
+}
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
@@ -1,10 +1,35 @@
 # Logic
 import os
+import io
+import sys
 import csv
+import gzip
+import time
+import zipfile
+import struct
+import ctypes
+import ctypes.util
+import pickle
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional
+from functools import lru_cache
+from contextlib import contextmanager
+from operator import methodcaller
+from bisect import bisect_left, bisect_right
+from itertools import chain, compress, islice
+from collections import Counter, OrderedDict
+from array import array
+from heapq import nsmallest, nlargest, heappush, heappop
 from datetime import datetime, timedelta
 from dateutil import parser
 
+# Columnar backend (optional)
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 # Excel Export
 from openpyxl import Workbook
 from openpyxl.styles import PatternFill, Alignment, Font
@@ -26,98 +51,235 @@ from tkcalendar import Calendar
 customtkinter.set_appearance_mode("System")
 customtkinter.set_default_color_theme("blue")
 
+# a term only has a few hundred distinct dates and a few dozen distinct times,
+# so the parsed values are shared between rows instead of parsed per row
+@lru_cache(maxsize=4096)
+def parseDate(date):
+    return datetime.strptime(date, '%d/%m/%Y')
+
+@lru_cache(maxsize=1024)
+def parseTime(time):
+    return datetime.strptime(time, '%H:%M:%S')
+
+@lru_cache(maxsize=1024)
+def parseDuration(duration):
+    return datetime.strptime(duration, '%H:%M')
+
+@lru_cache(maxsize=64)
+def parseWeekday(day):
+    return parser.parse(day).weekday()
+
+@lru_cache(maxsize=1024)
+def parseSize(size):
+    return int(size)
+
 class Schedule:
-    def __init__(self, name, description, date, day, start_time, end_time, duration, location, size, lecturer, zone):
+    # no per-instance __dict__, and the repeated strings are interned so every row points at one copy
+    __slots__ = ("__cohort", "__study_mode", "__module_code", "__class_type", "__description", "__date", "__day", "__start_time", "__end_time", "__duration", "__lecturer", "__location", "__size", "__zone", "__raw")
+
+    def __init__(self, name, description, date, day, start_time, end_time, duration, location, size, lecturer, zone, lazy=False):
+        if lazy:
+            # keep the raw strings, each field is parsed on first access
+            self.__raw:Optional[tuple] = (name, description, date, day, start_time, end_time, duration, location, size, lecturer, zone)
+            self.__cohort:Optional[str] = None
+            self.__study_mode:Optional[str] = None
+            self.__module_code:Optional[str] = None
+            self.__class_type:Optional[str] = None
+            self.__description:Optional[str] = None
+            self.__date:Optional[datetime] = None
+            self.__day:Optional[int] = None
+            self.__start_time:Optional[datetime] = None
+            self.__end_time:Optional[datetime] = None
+            self.__duration:Optional[datetime] = None
+            self.__lecturer:Optional[str] = None
+            self.__location:Optional[str] = None
+            self.__size:Optional[int] = None
+            self.__zone:Optional[str] = None
+        else:
+            self.__raw = None
+            self.__setName(name)
+            self.__description = sys.intern(description)
+            self.__date = parseDate(date)
+            self.__day = parseWeekday(day)
+            self.__start_time = parseTime(start_time)
+            self.__end_time = parseTime(end_time)
+            self.__duration = parseDuration(duration)
+            self.__lecturer = sys.intern(lecturer)
+            self.__location = sys.intern(location)
+            self.__size = parseSize(size)
+            self.__zone = sys.intern(zone)
+
+    def __setName(self, name):
         name = name.split("_")
-        self.__cohort:str = "_".join(name[0:2])
-        self.__study_mode:str = name[2]
-        self.__module_code:str = name[3]
-        self.__class_type:str = name[4]
-        self.__description:str = description
-        self.__date:datetime = datetime.strptime(date, '%d/%m/%Y')
-        self.__day:int = parser.parse(day).weekday()
-        self.__start_time:datetime = datetime.strptime(start_time, '%H:%M:%S')
-        self.__end_time:datetime = datetime.strptime(end_time, '%H:%M:%S')
-        self.__duration:datetime = datetime.strptime(duration, '%H:%M')
-        self.__lecturer:str = lecturer
-        self.__location:str = location
-        self.__size:int = int(size)
-        self.__zone:str = zone
+        self.__cohort = sys.intern("_".join(name[0:2]))
+        self.__study_mode = sys.intern(name[2])
+        self.__module_code = sys.intern(name[3])
+        self.__class_type = sys.intern(name[4])
+
+    def __getName(self):
+        if self.__cohort == None:
+            self.__setName(self.__raw[0]) # type: ignore
+
+    def __getDescription(self):
+        if self.__description == None:
+            self.__description = sys.intern(self.__raw[1]) # type: ignore
+        return self.__description
+
+    def __getDate(self):
+        if self.__date == None:
+            self.__date = parseDate(self.__raw[2]) # type: ignore
+        return self.__date
+
+    def __getDay(self):
+        if self.__day == None:
+            self.__day = parseWeekday(self.__raw[3]) # type: ignore
+        return self.__day
+
+    def __getStartTime(self):
+        if self.__start_time == None:
+            self.__start_time = parseTime(self.__raw[4]) # type: ignore
+        return self.__start_time
+
+    def __getEndTime(self):
+        if self.__end_time == None:
+            self.__end_time = parseTime(self.__raw[5]) # type: ignore
+        return self.__end_time
+
+    def __getDuration(self):
+        if self.__duration == None:
+            self.__duration = parseDuration(self.__raw[6]) # type: ignore
+        return self.__duration
+
+    def __getLocation(self):
+        if self.__location == None:
+            self.__location = sys.intern(self.__raw[7]) # type: ignore
+        return self.__location
+
+    def __getSize(self):
+        if self.__size == None:
+            self.__size = parseSize(self.__raw[8]) # type: ignore
+        return self.__size
+
+    def __getLecturer(self):
+        if self.__lecturer == None:
+            self.__lecturer = sys.intern(self.__raw[9]) # type: ignore
+        return self.__lecturer
+
+    def __getZone(self):
+        if self.__zone == None:
+            self.__zone = sys.intern(self.__raw[10]) # type: ignore
+        return self.__zone
 
     def getItem(self, variable):
         match variable:
             case "Cohort":
+                self.__getName()
                 return self.__cohort
             case "Study_Mode":
+                self.__getName()
                 return self.__study_mode
             case "Module_Code":
+                self.__getName()
                 return self.__module_code
             case "Class_Type":
+                self.__getName()
                 return self.__class_type
             case "Description":
-                return self.__description.split(" (")[0]
+                return self.__getDescription().split(" (")[0]
             case "Activity date" | "Date" | "Start_Date" | "End_Date":
-                return self.__date
+                return self.__getDate()
             case "Date_str":
-                return self.__date.strftime('%d/%m/%Y')
+                return self.__getDate().strftime('%d/%m/%Y')
             case "Scheduled Day" | "Day":
-                return self.__day
+                return self.__getDay()
             case "Day_str":
                 weekday = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-                return weekday[self.__day]
+                return weekday[self.__getDay()]
             case "Scheduled Start Time" | "Start_Time":
-                return self.__start_time
+                return self.__getStartTime()
             case "Start_Time_str":
-                return self.__start_time.strftime('%H:%M:%S')
+                return self.__getStartTime().strftime('%H:%M:%S')
             case "Scheduled End Time" | "End_Time":
-                return self.__end_time
+                return self.__getEndTime()
             case "End_Time_str":
-                return self.__end_time.strftime('%H:%M:%S')
+                return self.__getEndTime().strftime('%H:%M:%S')
             case "Time":
-                return f"{self.__start_time.strftime('%H:%M')} ~ {self.__end_time.strftime('%H:%M')}"
+                return f"{self.__getStartTime().strftime('%H:%M')} ~ {self.__getEndTime().strftime('%H:%M')}"
             case "Duration":
-                return self.__duration.strftime('%H:%M')
+                return self.__getDuration().strftime('%H:%M')
             case "Allocated Staff Name" | "Lecturer":
-                return self.__lecturer
+                return self.__getLecturer()
             case "Allocated Location Name" | "Location":
-                return self.__location
+                return self.__getLocation()
             case "Planned Size" | "Size" | "Min_Size" | "Max_Size":
-                return self.__size
+                return self.__getSize()
             case "Size_str":
-                return str(self.__size)
+                return str(self.__getSize())
             case "Zone Name" | "Zone":
-                return self.__zone
+                return self.__getZone()
             case "Date_Time":
-                return datetime(self.__date.year, self.__date.month, self.__date.day, self.__start_time.hour, self.__start_time.minute, self.__start_time.second)
+                date = self.__getDate()
+                start_time = self.__getStartTime()
+                return datetime(date.year, date.month, date.day, start_time.hour, start_time.minute, start_time.second)
             case _:
                 raise Exception("Wrong input type")
 
+def readRows(fileName, stream):
+    # (validity, rows), each row holds the 11 fields a Schedule is built from
+    # validate the format while reading, so each file is read once
+    with io.TextIOWrapper(stream) as csv_file:
+        csv_reader = csv.reader(csv_file)
+        headers = next(csv_reader, [])
+
+        # file ends with .csv
+        # header 12 len
+        if not isSource(fileName) or len(headers)!=12:
+            return False, []
+
+        rows = []
+        for row in csv_reader:
+            if row == []:
+                continue
+            # each row has 12 field
+            if len(row) < 12:
+                return False, []
+            rows.append(row[1:12])
+
+    # row at least 1
+    return len(rows) >= 1, rows
+
+def encodeRows(rows):
+    # per field its distinct values and an array of codes into them,
+    # so a file pickles as a few small blobs instead of an object graph per row
+    columns = []
+    for field in zip(*rows):
+        codes:dict[str, int] = {}
+        indices = array("I", [codes.setdefault(value, len(codes)) for value in field])
+        columns.append((list(codes), indices))
+    return columns
+
+def decodeRows(columns):
+    return zip(*[map(values.__getitem__, codes) for values, codes in columns])
+
 class File:
-    def __init__(self, directoryPath, fileName):
+    def __init__(self, directoryPath, fileName, content=None, fingerprint=None, lazy=False, columns=None):
         self.__fileName:str = fileName
         self.__directoryPath:str = directoryPath
-        self.__validity:bool = self.__validateFormat()
-
-    def __validateFormat(self):
-        with open(self.getPath()) as csv_file:
-            dict_reader = csv.DictReader(csv_file)
-            headers = dict_reader.fieldnames
-            rows = 0
-    
-            for row in dict_reader:
-                for value in row.values():
-                    if value == None:
-                        return False
-                rows += 1
-            
-            # file ends with .csv
-            # header 12 len
-            # row at least 1
-            # each row has 12 field
-            if not self.__fileName.endswith(".csv") or len(headers)!=12 or rows<1: # type: ignore
-                return False
-
-        return True
+        self.__lazy:bool = lazy
+        if fingerprint == None:
+            content, fingerprint = readSource(directoryPath, fileName)
+        self.__fingerprint:tuple = fingerprint # type: ignore
+        if columns != None:
+            # parsed by a worker process, see parseColumns
+            self.__validity, columns = columns
+            rows = decodeRows(columns)
+        elif content != None:
+            self.__validity, rows = readRows(fileName, io.BytesIO(content))
+        else:
+            # compressed sources are decompressed while they are parsed
+            with openSource(directoryPath, fileName) as stream:
+                self.__validity, rows = readRows(fileName, stream)
+        self.__schedules:list[Schedule] = [Schedule(*row, lazy) for row in rows]
 
     def getPath(self):
         return self.__directoryPath + self.__fileName
@@ -128,33 +290,320 @@ class File:
     def getValidity(self):
         return self.__validity
 
+    def getSchedules(self):
+        return self.__schedules
+
+    def getFingerprint(self):
+        # (mtime, size, content hash, bytes read), mtime and size are the archive's for archive members
+        return self.__fingerprint
+
+    def setFingerprint(self, fingerprint):
+        self.__fingerprint = fingerprint
+
+def isSource(fileName):
+    return fileName.endswith(".csv") or fileName.endswith(".csv.gz")
+
+def splitArchivePath(directoryPath, fileName):
+    # "faculty/bundle.zip/inner/a.csv" -> ("<directory>faculty/bundle.zip", "inner/a.csv"), member is None outside archives
+    parts = fileName.split("/")
+    for index in range(len(parts)-1):
+        archivePath = directoryPath + "/".join(parts[:index+1])
+        if parts[index].endswith(".zip") and os.path.isfile(archivePath):
+            return archivePath, "/".join(parts[index+1:])
+    return directoryPath + fileName, None
+
+def listSources(directoryPath):
+    # .csv and .csv.gz files in every sub directory and .csv files inside .zip archives, relative to the directory
+    sources = []
+    for root, directories, files in os.walk(directoryPath):
+        directories.sort()
+        relative = os.path.relpath(root, directoryPath).replace(os.sep, "/")
+        prefix = "" if relative == "." else relative + "/"
+        for file in sorted(files):
+            if isSource(file):
+                sources.append(prefix + file)
+            elif file.endswith(".zip"):
+                path = os.path.join(root, file)
+                try:
+                    stat = os.stat(path)
+                    members = listArchive(path, stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue
+                sources.extend(f"{prefix}{file}/{member}" for member in members)
+    return sources
+
+# keyed by the archive's mtime and size, so an unchanged archive is not opened again on every load
+@lru_cache(maxsize=256)
+def listArchive(path, mtime, size):
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return tuple(sorted(info.filename for info in archive.infolist() if not info.is_dir() and info.filename.endswith(".csv")))
+    except zipfile.BadZipFile:
+        return ()
+
+@contextmanager
+def openSource(directoryPath, fileName):
+    # binary stream of the source, archives and gzip files are decompressed as they are read and never extracted
+    path, member = splitArchivePath(directoryPath, fileName)
+    if member != None:
+        with zipfile.ZipFile(path) as archive, archive.open(member) as stream:
+            yield stream
+    elif fileName.endswith(".gz"):
+        with gzip.open(path) as stream:
+            yield stream
+    else:
+        with open(path, "rb") as stream:
+            yield stream
+
+def statSource(directoryPath, fileName):
+    stat = os.stat(splitArchivePath(directoryPath, fileName)[0])
+    return stat.st_mtime_ns, stat.st_size
+
+def readSource(directoryPath, fileName):
+    # (content, fingerprint), plain files are read whole so one read is both hashed and parsed,
+    # compressed sources are hashed without decompressing (zip members by their CRC) and parsed as a stream later
+    path, member = splitArchivePath(directoryPath, fileName)
+    # stat before reading so a write in between shows up as a change next time
+    stat = os.stat(path)
+    if member != None:
+        with zipfile.ZipFile(path) as archive:
+            info = archive.getinfo(member)
+        return None, (stat.st_mtime_ns, stat.st_size, f"{info.CRC:08x}:{info.file_size}", info.compress_size)
+    if fileName.endswith(".gz"):
+        digest = hashlib.sha1()
+        with open(path, "rb") as source:
+            for chunk in iter(lambda: source.read(1 << 20), b""):
+                digest.update(chunk)
+        return None, (stat.st_mtime_ns, stat.st_size, digest.hexdigest(), stat.st_size)
+    with open(path, "rb") as csv_file:
+        content = csv_file.read()
+    return content, (stat.st_mtime_ns, stat.st_size, hashlib.sha1(content).hexdigest(), stat.st_size)
+
+def loadFile(directoryPath, fileName, content=None, fingerprint=None, lazy=False):
+    return File(directoryPath, fileName, content, fingerprint, lazy)
+
+def parseColumns(directoryPath, fileName, content, fingerprint):
+    # runs in a worker process, only (validity, encoded rows) is sent back and the parent builds the Schedules
+    # None when the file was removed before it could be read
+    if content != None:
+        validity, rows = readRows(fileName, io.BytesIO(content))
+    else:
+        try:
+            with openSource(directoryPath, fileName) as stream:
+                validity, rows = readRows(fileName, stream)
+        except (OSError, EOFError, zipfile.BadZipFile):
+            return None
+    return validity, encodeRows(rows)
+
+# bump when Schedule or File change shape so old snapshots are ignored
+SNAPSHOT_VERSION = 4
+
+def getCacheDirectory():
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "timetable_viewer")
+
+class LoadProgress:
+    def __init__(self, filesTotal):
+        self.__filesTotal:int = filesTotal
+        self.__filesDone:int = 0
+        self.__rowsDone:int = 0
+        self.__bytesRead:int = 0
+
+    def update(self, file):
+        self.__filesDone += 1
+        self.__rowsDone += len(file.getSchedules())
+        self.__bytesRead += file.getFingerprint()[3]
+
+    def getFilesTotal(self):
+        return self.__filesTotal
+
+    def getFilesDone(self):
+        return self.__filesDone
+
+    def getRowsDone(self):
+        return self.__rowsDone
+
+    def getBytesRead(self):
+        return self.__bytesRead
+
 class ScheduleHandler:
-    def __init__(self):
+    def __init__(self, workers=1, cacheDirectory=None, lazy=False):
         self.__files:list[File] = []
         self.__schedules:list[Schedule] = []
         self.__ignoreFiles:list[str] = []
+        self.__workers:int = workers
+        self.__version:int = 0
+        self.__cacheDirectory:Optional[str] = cacheDirectory
+        self.__lazy:bool = lazy
 
     def resetHandler(self):
         self.__files:list[File] = []
         self.__schedules:list[Schedule] = []
+        self.__version += 1
     
     def loadDirectory(self, directoryPath):
-        for file in os.listdir(directoryPath):
-            if file.endswith(".csv") and file not in self.__ignoreFiles:
-                new_file = File(directoryPath, file)
-                self.__files.append(new_file)
+        for _ in self.iterDirectory(directoryPath):
+            pass
+
+    def iterDirectory(self, directoryPath, batchSize=1000):
+        # yields (schedules, progress) in file order while the directory loads,
+        # the handler switches over to the new schedules once the generator is exhausted
+        # only files that were added or whose mtime, size and content hash changed are parsed again
+        fileNames = [file for file in listSources(directoryPath) if file not in self.__ignoreFiles]
+        loadedFiles = {file.getPath(): file for file in self.__files}
+        paths = {directoryPath + fileName for fileName in fileNames}
+        changed = loadedFiles.keys() != paths
+
+        # nothing of this directory is loaded yet (cold start or another directory before),
+        # reuse whatever the snapshot still has a matching fingerprint for
+        if self.__cacheDirectory != None and loadedFiles.keys().isdisjoint(paths):
+            loadedFiles = self.__readSnapshot(directoryPath)
+        stale = len(loadedFiles) != len(fileNames)
+
+        sources = self.__checkFiles(directoryPath, fileNames, loadedFiles)
+        executor = None
+        if self.__workers > 1:
+            sources = list(sources)
+            pending = [(fileName, content, fingerprint) for fileName, file, content, fingerprint in sources if file == None]
+            if len(pending) > self.__workers:
+                # parse in worker processes, map keeps the results in file name order
+                executor = ProcessPoolExecutor(max_workers=self.__workers)
+                new_columns = executor.map(parseColumns, [directoryPath]*len(pending), *zip(*pending), chunksize=max(1, len(pending)//(self.__workers*4)))
+
+        progress = LoadProgress(len(fileNames))
+        files:list[File] = []
+        batch:list[Schedule] = []
+        try:
+            for fileName, file, content, fingerprint in sources:
+                if fingerprint != None:
+                    stale = True
+                if file == None:
+                    changed = True
+                    try:
+                        if executor != None:
+                            columns = next(new_columns) # type: ignore
+                            if columns == None:
+                                raise FileNotFoundError(directoryPath + fileName)
+                            file = File(directoryPath, fileName, fingerprint=fingerprint, lazy=self.__lazy, columns=columns)
+                        else:
+                            file = loadFile(directoryPath, fileName, content, fingerprint, self.__lazy)
+                    except (OSError, EOFError, zipfile.BadZipFile):
+                        # removed while it was being parsed
+                        continue
+                files.append(file)
+
+                if file.getValidity() == True:
+                    batch.extend(file.getSchedules())
+                progress.update(file)
+                while len(batch) >= batchSize:
+                    yield batch[:batchSize], progress
+                    del batch[:batchSize]
+            yield batch, progress
+        finally:
+            if executor != None:
+                executor.shutdown(cancel_futures=True)
+
+        # files that vanished while loading are left out as if they had been removed
+        if len(files) != len(fileNames):
+            changed = stale = True
+
+        if changed:
+            self.__setFiles(files)
+
+        if self.__cacheDirectory != None and stale:
+            self.__writeSnapshot(directoryPath)
+
+    def __checkFiles(self, directoryPath, fileNames, loadedFiles):
+        for fileName in fileNames:
+            try:
+                yield self.__checkFile(directoryPath, fileName, loadedFiles.get(directoryPath + fileName))
+            except (OSError, KeyError, zipfile.BadZipFile):
+                # gone again since listSources listed it
+                continue
+
+    def updateFiles(self, directoryPath, fileNames):
+        # apply the deltas reported by a DirectoryWatcher, only the given files are checked and parsed again
+        files = {file.getFileName(): file for file in self.__files}
+        changed = False
+        stale = False
+        for fileName in fileNames:
+            path = directoryPath + fileName
+            try:
+                if not isSource(fileName) or fileName in self.__ignoreFiles:
+                    raise FileNotFoundError(path)
+                fileName, file, content, fingerprint = self.__checkFile(directoryPath, fileName, files.get(fileName))
+            except (OSError, KeyError, zipfile.BadZipFile):
+                # removed, or gone again before it could be read
+                if files.pop(fileName, None) != None:
+                    changed = stale = True
+                continue
+            if fingerprint != None:
+                stale = True
+            if file == None:
+                try:
+                    files[fileName] = loadFile(directoryPath, fileName, content, fingerprint, self.__lazy)
+                except (OSError, EOFError, zipfile.BadZipFile):
+                    # removed while it was being parsed
+                    if files.pop(fileName, None) != None:
+                        changed = stale = True
+                    continue
+                changed = True
+
+        if changed:
+            # same order as a full load
+            order = {fileName: index for index, fileName in enumerate(listSources(directoryPath))}
+            self.__setFiles(sorted(files.values(), key=lambda file: order.get(file.getFileName(), len(order))))
+
+        if self.__cacheDirectory != None and stale:
+            self.__writeSnapshot(directoryPath)
+
+    def __setFiles(self, files):
+        self.__files = files
 
         # load schedules
+        self.__schedules = []
         for file in self.__files:
-
-            if file.getValidity() == True and file.getFileName() not in self.__ignoreFiles:
-                with open(file.getPath()) as csv_file:
-                    csv_reader = csv.reader(csv_file)
-                    # skip the first row
-                    next(csv_reader)
-                    for schedule in csv_reader:
-                        new_schedule = Schedule(schedule[1], schedule[2], schedule[3], schedule[4], schedule[5], schedule[6], schedule[7], schedule[8], schedule[9], schedule[10], schedule[11])
-                        self.__schedules.append(new_schedule)
+            if file.getValidity() == True:
+                self.__schedules.extend(file.getSchedules())
+        self.__version += 1
+
+    def __checkFile(self, directoryPath, fileName, old_file):
+        # (fileName, loaded file or None, content to parse, fingerprint when the file was read)
+        if old_file != None and old_file.getFingerprint()[:2] == statSource(directoryPath, fileName):
+            return fileName, old_file, None, None
+        content, fingerprint = readSource(directoryPath, fileName)
+        if old_file != None and old_file.getFingerprint()[2] == fingerprint[2]:
+            old_file.setFingerprint(fingerprint)
+            return fileName, old_file, None, fingerprint
+        return fileName, None, content, fingerprint
+
+    def __getSnapshotPath(self, directoryPath):
+        name = hashlib.sha1(os.path.abspath(directoryPath).encode()).hexdigest()
+        return os.path.join(self.__cacheDirectory, f"{name}.snapshot") # type: ignore
+
+    def __readSnapshot(self, directoryPath):
+        try:
+            with open(self.__getSnapshotPath(directoryPath), "rb") as snapshot_file:
+                version, files = pickle.load(snapshot_file)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError, TypeError):
+            return {}
+        if version != SNAPSHOT_VERSION:
+            return {}
+        return {file.getPath(): file for file in files if file.getPath() == directoryPath + file.getFileName()}
+
+    def __writeSnapshot(self, directoryPath):
+        path = self.__getSnapshotPath(directoryPath)
+        try:
+            os.makedirs(self.__cacheDirectory, exist_ok=True) # type: ignore
+            with open(path + ".tmp", "wb") as snapshot_file:
+                pickle.dump((SNAPSHOT_VERSION, self.__files), snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            # the snapshot is only a cache, loading still works without it
+            pass
+
+    def setWorkers(self, workers):
+        self.__workers = workers
 
     def getFiles(self):
         return self.__files
@@ -165,6 +614,128 @@ class ScheduleHandler:
     def addIgnore(self, fileName):
         self.__ignoreFiles.append(fileName)
 
+    def getVersion(self):
+        # bumped whenever the loaded schedules change
+        return self.__version
+
+# inotify flags: modify, attrib, close_write, moved_from, moved_to, create, delete
+INOTIFY_MASK = 0x2 | 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200
+INOTIFY_CREATE = 0x100
+INOTIFY_OVERFLOW = 0x4000
+INOTIFY_ISDIR = 0x40000000
+
+class DirectoryWatcher:
+    # reports the sources that were added, changed or removed once writes have been quiet for the debounce time,
+    # uses inotify on Linux and falls back to polling mtime and size elsewhere
+    def __init__(self, directoryPath, debounce=1.0):
+        self.__directoryPath:str = directoryPath
+        self.__debounce:float = debounce
+        self.__pending:set[str] = set()
+        self.__rescan:bool = False
+        self.__lastEvent:float = 0
+        self.__entries:dict[str, tuple] = {}
+        self.__watches:dict[int, str] = {}
+        self.__inotify:Optional[int] = self.__startInotify()
+        if self.__inotify == None:
+            self.__entries = self.__scan()
+
+    def __startInotify(self):
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            self.__libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = self.__libc.inotify_init1(os.O_NONBLOCK)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        # inotify is not recursive, every sub directory gets its own watch
+        for root, _, _ in os.walk(self.__directoryPath):
+            if not self.__addWatch(fd, root):
+                os.close(fd)
+                return None
+        return fd
+
+    def __addWatch(self, fd, path):
+        wd = self.__libc.inotify_add_watch(fd, os.fsencode(path), INOTIFY_MASK)
+        if wd < 0:
+            return False
+        relative = os.path.relpath(path, self.__directoryPath).replace(os.sep, "/")
+        self.__watches[wd] = "" if relative == "." else relative + "/"
+        return True
+
+    def __readInotify(self):
+        changes = set()
+        rescan = False
+        while True:
+            try:
+                buffer = os.read(self.__inotify, 65536) # type: ignore
+            except BlockingIOError:
+                return None if rescan else changes
+            offset = 0
+            while offset < len(buffer):
+                # struct inotify_event: int wd, uint32 mask, uint32 cookie, uint32 len, char name[len]
+                wd, mask, _, length = struct.unpack_from("iIII", buffer, offset)
+                name = self.__watches.get(wd, "") + os.fsdecode(buffer[offset+16:offset+16+length].rstrip(b"\0"))
+                offset += 16 + length
+                if mask & INOTIFY_OVERFLOW:
+                    rescan = True
+                elif mask & INOTIFY_ISDIR:
+                    # a whole directory came or went
+                    if mask & INOTIFY_CREATE:
+                        for root, _, _ in os.walk(self.__directoryPath + name):
+                            self.__addWatch(self.__inotify, root)
+                    rescan = True
+                elif name.endswith(".zip"):
+                    rescan = True
+                elif isSource(name):
+                    changes.add(name)
+
+    def __scan(self):
+        entries = {}
+        for root, _, files in os.walk(self.__directoryPath):
+            relative = os.path.relpath(root, self.__directoryPath).replace(os.sep, "/")
+            prefix = "" if relative == "." else relative + "/"
+            for file in files:
+                if isSource(file) or file.endswith(".zip"):
+                    try:
+                        stat = os.stat(os.path.join(root, file))
+                    except OSError:
+                        # gone again since the walk listed it, e.g. a temporary file renamed into place
+                        continue
+                    entries[prefix + file] = (stat.st_mtime_ns, stat.st_size)
+        return entries
+
+    def __readScan(self):
+        entries = self.__scan()
+        changes = {name for name in entries.keys() | self.__entries.keys() if entries.get(name) != self.__entries.get(name)}
+        self.__entries = entries
+        if any(name.endswith(".zip") for name in changes):
+            return None
+        return changes
+
+    def poll(self):
+        # changed source names, an empty set while nothing is due, or None when everything needs a rescan
+        changes = self.__readInotify() if self.__inotify != None else self.__readScan()
+        if changes == None:
+            self.__rescan = True
+            self.__lastEvent = time.monotonic()
+        elif len(changes) > 0:
+            self.__pending |= changes
+            self.__lastEvent = time.monotonic()
+        if (len(self.__pending) > 0 or self.__rescan) and time.monotonic() - self.__lastEvent >= self.__debounce:
+            pending = None if self.__rescan else self.__pending
+            self.__pending = set()
+            self.__rescan = False
+            self.__lastEvent = 0
+            return pending
+        return set()
+
+    def stop(self):
+        if self.__inotify != None:
+            os.close(self.__inotify)
+            self.__inotify = None
+
 # Data Structure & Sorting Algorithm
 class Heap:
     def __init__(self, schedules, variable):
@@ -230,17 +801,108 @@ class Heap:
             sortedSchedules.append(self.__popMin())
         return sortedSchedules
 
+# variables that read the same item share one column
+COLUMNAR_ALIASES = {"Start_Date": "Date", "End_Date": "Date", "Min_Size": "Size", "Max_Size": "Size"}
+
+def getInteger(value):
+    # dates and times as whole seconds, so they compare and sort like the datetimes
+    if isinstance(value, datetime):
+        return value.toordinal()*86400 + value.hour*3600 + value.minute*60 + value.second
+    return value
+
+class ColumnarTable:
+    # the schedules as one typed array per column, each built the first time it is sorted or filtered on
+    # dates and times are integers, strings are codes into their sorted distinct values so codes order like the strings
+    def __init__(self, schedules):
+        self.__schedules:list[Schedule] = schedules
+        # the rows the columns were built from, the same list may have been changed in place since
+        self.__rows:list[Schedule] = list(schedules)
+        self.__columns:dict = {}
+        self.__codes:dict[str, dict[str, int]] = {}
+
+    def isBuiltFrom(self, schedules):
+        # a list compares its items by identity first, so this is one pass without calling Schedule
+        return schedules is self.__schedules and schedules == self.__rows
+
+    def getColumn(self, variable):
+        variable = COLUMNAR_ALIASES.get(variable, variable)
+        if variable not in self.__columns:
+            values = [schedule.getItem(variable) for schedule in self.__schedules]
+            distinct = set(values)
+            if any(isinstance(value, str) for value in distinct):
+                codes = {value: code for code, value in enumerate(sorted(distinct))}
+                self.__codes[variable] = codes
+            else:
+                codes = {value: getInteger(value) for value in distinct}
+            self.__columns[variable] = numpy.fromiter(map(codes.__getitem__, values), dtype=numpy.int64, count=len(values))
+        return self.__columns[variable]
+
+    def encode(self, variable, value):
+        # the column value to compare with, None when no row can have it
+        variable = COLUMNAR_ALIASES.get(variable, variable)
+        self.getColumn(variable)
+        if variable in self.__codes:
+            return self.__codes[variable].get(value)
+        return getInteger(value)
+
+    def getRows(self, order):
+        return list(map(self.__schedules.__getitem__, order.tolist()))
+
 class Sorter:
+    # "key" extracts each row's key once and runs a stable sort, "heap" is the original Heap
+    # "numpy" argsorts typed columns that are kept while the same, unchanged schedules are sorted again
+    engine:str = "key"
+    __table:Optional[ColumnarTable] = None
+
+    def setEngine(self, engine):
+        if engine == "numpy" and numpy == None:
+            raise Exception("numpy is not installed")
+        self.engine = engine
+
+    def getTable(self, schedules):
+        if self.__table == None or not self.__table.isBuiltFrom(schedules):
+            self.__table = ColumnarTable(schedules)
+        return self.__table
+
     def sort(self, schedules, variable, descending=False):
-        heap = Heap(schedules, variable)
-        heap.heapify()
-        sortedSchedules = heap.listify()
+        if self.engine == "heap":
+            heap = Heap(schedules, variable)
+            heap.heapify()
+            sortedSchedules = heap.listify()
+            if descending:
+                sortedSchedules.reverse()
+            return sortedSchedules
+        if self.engine == "numpy":
+            table = self.getTable(schedules)
+            column = table.getColumn(variable)
+            # a stable argsort of the negated column keeps equal rows in their order, like sorted(reverse=True)
+            return table.getRows(numpy.argsort(-column if descending else column, kind="stable"))
+        return sorted(schedules, key=methodcaller("getItem", variable), reverse=descending)
+
+    def sortTop(self, schedules, variable, top, descending=False):
+        # the first top schedules of sort() in O(n log top), O(n + top log top) with numpy
+        if self.engine == "numpy":
+            if top >= len(schedules):
+                return self.sort(schedules, variable, descending)
+            if top <= 0:
+                return []
+            table = self.getTable(schedules)
+            column = table.getColumn(variable)
+            keys = -column if descending else column
+            # every row below the top-th key, then the earliest rows equal to it, as a stable sort would have them
+            threshold = numpy.partition(keys, top - 1)[top - 1]
+            below = numpy.flatnonzero(keys < threshold)
+            rows = numpy.concatenate([below, numpy.flatnonzero(keys == threshold)[:top - len(below)]])
+            rows.sort()
+            return table.getRows(rows[numpy.argsort(keys[rows], kind="stable")])
         if descending:
-            sortedSchedules.reverse()
-        return sortedSchedules
+            return nlargest(top, schedules, key=methodcaller("getItem", variable))
+        return nsmallest(top, schedules, key=methodcaller("getItem", variable))
 
 class Filter(Sorter):
     def filter(self, schedules, variable, value):
+        if self.engine == "numpy":
+            return self.__filterColumns(schedules, variable, value)
         sortedSchedules = self.sort(schedules, variable)
         filteredSchedules = []
         match variable:
@@ -255,6 +917,29 @@ class Filter(Sorter):
                 for value in values:
                     filteredSchedules.extend(self.__binaryRangeSearch(sortedSchedules, variable, value=value))
         return filteredSchedules
+
+    def __filterColumns(self, schedules, variable, value):
+        # boolean masks over the typed column, rows come out in the order of the binary search path:
+        # ascending by the column for a range, per value in the order given otherwise
+        if schedules == []:
+            return []
+        table = self.getTable(schedules)
+        column = table.getColumn(variable)
+        match variable:
+            case "Date" | "Start_Time" | "End_Time" | "Size":
+                values = [value]
+            case "Start_Date" | "End_Date":
+                bound = table.encode(variable, value)
+                rows = numpy.flatnonzero(column >= bound if variable == "Start_Date" else column <= bound)
+                return table.getRows(rows[numpy.argsort(column[rows], kind="stable")])
+            case _:
+                values = value.split("&&&")
+        rows = [numpy.empty(0, dtype=numpy.int64)]
+        for value in values:
+            code = table.encode(variable, value)
+            if code != None:
+                rows.append(numpy.flatnonzero(column == code))
+        return table.getRows(numpy.concatenate(rows))
  
     def __binaryRangeSearch(self, schedules, variable, value=None, min_value=None, max_value=None):
             # binary search
@@ -320,51 +1005,778 @@ class Filter(Sorter):
             else:
                 return []
                 
+BITMAP_COLUMNS = ["Cohort", "Study_Mode", "Lecturer", "Module_Code", "Class_Type", "Location", "Zone", "Description", "Day_str"]
+
+def getBitmapRows(bitmap):
+    # the set bits of a row bitmap in ascending order
+    bits = bin(bitmap)[:1:-1]
+    rows = []
+    row = bits.find("1")
+    while row >= 0:
+        rows.append(row)
+        row = bits.find("1", row + 1)
+    return rows
+
+class BitmapIndex:
+    # a row bitmap per value of a column, bit i is set when row i has the value
+    def __init__(self, order, rank):
+        self.__order:list[int] = order
+        self.__rank:list[int] = rank
+        self.__bitmaps:dict[int, int] = {}
+
+    def getBitmap(self, bounds):
+        # union of the values whose rows are the runs order[low:high], each bitmap is built the first time it is needed
+        bitmap = 0
+        for low, high in bounds:
+            value = self.__rank[self.__order[low]]
+            if value not in self.__bitmaps:
+                self.__bitmaps[value] = self.__build(self.__order[low:high])
+            bitmap |= self.__bitmaps[value]
+        return bitmap
+
+    def __build(self, rows):
+        buffer = bytearray(len(self.__order) // 8 + 1)
+        for row in rows:
+            buffer[row >> 3] |= 1 << (row & 7)
+        return int.from_bytes(buffer, "little")
+
+INTERVAL_FILTERS = ["Active_At", "Overlap", "Time_Window"]
+
+def getMinutes(date, time):
+    # whole minutes from the start of the calendar, or from midnight when there is no date
+    days = 0 if date == None else date.toordinal()
+    return days*1440 + time.hour*60 + time.minute
+
+def getWindow(start_time, end_time):
+    # a start and end time of day in minutes, an end before the start wraps past midnight
+    low = getMinutes(None, start_time)
+    high = getMinutes(None, end_time)
+    if high < low:
+        high += 1440
+    return low, high
+
+class IntervalIndex:
+    # half open [start, end) intervals of every row: a centered interval tree for stabbing queries
+    # and the rows sorted by start for overlaps, both answer in O(log n + k)
+    def __init__(self, starts, ends):
+        self.__starts:list[int] = starts
+        self.__ends:list[int] = ends
+        # empty intervals can never match
+        self.__byStart:list[int] = sorted((row for row in range(len(starts)) if starts[row] < ends[row]), key=starts.__getitem__)
+        self.__sortedStarts:list[int] = [starts[row] for row in self.__byStart]
+        self.__root = self.__build(self.__byStart)
+
+    def __build(self, rows):
+        # rows are sorted by start, the center is their median start
+        if len(rows) == 0:
+            return None
+        center = self.__starts[rows[len(rows) // 2]]
+        left, here, right = [], [], []
+        for row in rows:
+            if self.__ends[row] <= center:
+                left.append(row)
+            elif self.__starts[row] > center:
+                right.append(row)
+            else:
+                here.append(row)
+        byEnd = sorted(here, key=self.__ends.__getitem__, reverse=True)
+        return (center, here, byEnd, self.__build(left), self.__build(right))
+
+    def getActiveAt(self, point):
+        rows = []
+        node = self.__root
+        while node != None:
+            center, byStart, byEnd, left, right = node
+            if point < center:
+                for row in byStart:
+                    if self.__starts[row] > point:
+                        break
+                    rows.append(row)
+                node = left
+            elif point > center:
+                for row in byEnd:
+                    if self.__ends[row] <= point:
+                        break
+                    rows.append(row)
+                node = right
+            else:
+                rows.extend(byStart)
+                break
+        return rows
+
+    def getStarts(self):
+        return self.__starts
+
+    def getEnds(self):
+        return self.__ends
+
+    def getOverlapping(self, low, high):
+        if high <= low:
+            return self.getActiveAt(low)
+        # the intervals running at low that started before it, then every interval starting in [low, high)
+        rows = [row for row in self.getActiveAt(low) if self.__starts[row] < low]
+        rows.extend(self.__byStart[bisect_left(self.__sortedStarts, low):bisect_left(self.__sortedStarts, high)])
+        return rows
+
+def findClashes(rows, starts, ends):
+    # sweep the rows by start, every session still running when the next one starts overlaps it
+    # O(n log n + clashes), pairs come out as (earlier start, later start)
+    clashes = []
+    running = []
+    for row in sorted(rows, key=starts.__getitem__):
+        if starts[row] >= ends[row]:
+            continue
+        while len(running) > 0 and running[0][0] <= starts[row]:
+            heappop(running)
+        for _, other in running:
+            clashes.append((other, row))
+        heappush(running, (ends[row], row))
+    return clashes
+
+class OccupancyIndex:
+    # the busy time of every room or lecturer as sorted, merged [start, end) intervals in minutes
+    def __init__(self):
+        self.__starts:dict[str, list[int]] = {}
+        self.__ends:dict[str, list[int]] = {}
+
+    def addValue(self, value, rows, starts, ends):
+        merged_starts = []
+        merged_ends = []
+        for row in sorted(rows, key=starts.__getitem__):
+            if starts[row] >= ends[row]:
+                continue
+            if len(merged_ends) > 0 and starts[row] <= merged_ends[-1]:
+                merged_ends[-1] = max(merged_ends[-1], ends[row])
+            else:
+                merged_starts.append(starts[row])
+                merged_ends.append(ends[row])
+        self.__starts[value] = merged_starts
+        self.__ends[value] = merged_ends
+
+    def getValues(self):
+        return list(self.__starts)
+
+    def isFree(self, value, low, high):
+        # only the last busy interval starting before high can reach into [low, high)
+        index = bisect_left(self.__starts.get(value, []), high) - 1
+        return index < 0 or self.__ends[value][index] <= low
+
+    def getFreeSlots(self, value, low, high):
+        slots = []
+        starts = self.__starts.get(value, [])
+        ends = self.__ends.get(value, [])
+        index = max(bisect_right(starts, low) - 1, 0)
+        while low < high:
+            if index < len(starts) and starts[index] < high:
+                if starts[index] > low:
+                    slots.append((low, starts[index]))
+                low = max(low, ends[index])
+                index += 1
+            else:
+                slots.append((low, high))
+                break
+        return slots
+
+SEARCH_COLUMNS = ["Description", "Lecturer", "Location", "Module_Code"]
+
+class SearchIndex:
+    # the trigrams of every distinct value of a column, lower cased, for substring search
+    def __init__(self, values, counts):
+        self.__texts:list[str] = [str(value).lower() for value in values]
+        self.__counts:list[int] = counts
+        self.__grams:dict[str, set[int]] = {}
+        for index, text in enumerate(self.__texts):
+            for start in range(len(text) - 2):
+                self.__grams.setdefault(text[start:start+3], set()).add(index)
+
+    def getMatches(self, text):
+        # (score, index) of every value containing text, lower scores are better matches:
+        # the whole value, then a prefix, then the start of a word, then anywhere, more rows first within each
+        text = text.lower()
+        if len(text) < 3:
+            candidates = range(len(self.__texts))
+        else:
+            grams = sorted((self.__grams.get(text[start:start+3], set()) for start in range(len(text) - 2)), key=len)
+            candidates = grams[0].intersection(*grams[1:])
+        matches = []
+        for index in candidates:
+            value = self.__texts[index]
+            position = value.find(text)
+            if position < 0:
+                continue
+            if value == text:
+                kind = 0
+            elif position == 0:
+                kind = 1
+            elif not value[position-1].isalnum():
+                kind = 2
+            else:
+                kind = 3
+            matches.append(((kind, -self.__counts[index]), index))
+        return matches
+
+# columns with more values are counted from the matching rows, to bound the number of bitmaps kept
+FACET_BITMAP_LIMIT = 256
+
+# what a cached query costs besides its rows (key, dict entry, array header), so empty results count too
+CACHE_ENTRY_BYTES = 256
+
+FACET_COLUMNS = ["Cohort", "Study_Mode", "Lecturer", "Module_Code", "Description", "Duration", "Start_Time_str", "End_Time_str", "Class_Type", "Location", "Size", "Zone"]
+
 class ScheduleController(Filter):
-    def __init__(self, handler):
-        self.__processedSchedules:list[Schedule] = handler.getSchedules()
+    def __init__(self, handler, cacheLimit=64*1024*1024):
+        self.__schedules:list[Schedule] = handler.getSchedules()
+        self.__version:int = handler.getVersion()
+        self.resetProcessed()
+        # per column: the key of every row, all rows in ascending order, each row's dense rank (equal keys share a rank)
+        # the distinct keys in rank order and where each of their runs starts in the permutation
+        self.__keys:dict[str, list] = {}
+        self.__orders:dict[str, list[int]] = {}
+        self.__ranks:dict[str, list[int]] = {}
+        self.__values:dict[str, list] = {}
+        self.__runs:dict[str, list[int]] = {}
+        self.__distinct:dict[str, int] = {}
+        self.__plan:list[dict] = []
+        self.__bitmaps:dict[str, BitmapIndex] = {}
+        self.__intervals:dict[str, IntervalIndex] = {}
+        self.__clashes:dict[str, list[tuple[int, int]]] = {}
+        self.__copies:dict[str, dict[int, list[int]]] = {}
+        self.__occupancy:dict[str, OccupancyIndex] = {}
+        self.__rooms:dict[str, tuple[int, str]] = {}
+        self.__searches:dict[str, SearchIndex] = {}
+        # filtered rows of recent queries, least recently used first, limited to cacheLimit bytes
+        self.__cache:OrderedDict[tuple, array] = OrderedDict()
+        self.__cacheLimit:int = cacheLimit
+        self.__cacheBytes:int = 0
+        self.__cacheHits:int = 0
+        self.__cacheMisses:int = 0
+        self.__cacheEvictions:int = 0
+
+    def getVersion(self):
+        # the handler version the controller was built from
+        return self.__version
+
+    def __getOrder(self, variable):
+        # built the first time a column is used and kept for as long as the data is loaded
+        if variable not in self.__orders:
+            keys = [schedule.getItem(variable) for schedule in self.__schedules]
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            rank = [0]*len(order)
+            values = []
+            runs = []
+            for position, row in enumerate(order):
+                if len(values) == 0 or keys[row] != values[-1]:
+                    values.append(keys[row])
+                    runs.append(position)
+                rank[row] = len(values) - 1
+            runs.append(len(order))
+            self.__keys[variable] = keys
+            self.__orders[variable] = order
+            self.__ranks[variable] = rank
+            self.__values[variable] = values
+            self.__runs[variable] = runs
+            self.__distinct[variable] = len(values)
+        return self.__orders[variable]
+
+    def __sortRows(self, rows, variable, descending=False):
+        # stable, rows with equal keys keep their current order, and no schedule values are compared
+        self.__getOrder(variable)
+        rank = self.__ranks[variable]
+        if len(rows) * max(1, len(rows).bit_length()) < self.__distinct[variable] + len(rows):
+            return sorted(rows, key=rank.__getitem__, reverse=descending)
+        # counting sort over the dense ranks, linear in the number of rows
+        buckets:list[list[int]] = [[] for _ in range(self.__distinct[variable])]
+        for row in rows:
+            buckets[rank[row]].append(row)
+        if descending:
+            buckets.reverse()
+        return list(chain.from_iterable(buckets))
+
+    def __getBounds(self, variable, value):
+        # the runs of the column's permutation that satisfy the predicate, found by binary search
+        column = "Date" if variable in ["Start_Date", "End_Date"] else variable
+        order = self.__getOrder(column)
+        key = self.__keys[column].__getitem__
+        match variable:
+            case "Date" | "Start_Time" | "End_Time" | "Size":
+                values = [value]
+            case "Start_Date":
+                return column, [(bisect_left(order, value, key=key), len(order))]
+            case "End_Date":
+                return column, [(0, bisect_right(order, value, key=key))]
+            case _:
+                values = set(value.split("&&&"))
+        return column, [(bisect_left(order, value, key=key), bisect_right(order, value, key=key)) for value in values]
 
-    def control(self, sortBy, **query):
-        # filter
+    def __planQuery(self, query):
+        # every predicate with its exact number of matching rows, the most selective first
+        plan = []
         for variable, value in query.items():
-            if value != None:
-                self.__processedSchedules = self.filter(self.__processedSchedules, variable, value)
+            if value == None:
+                continue
+            if variable in INTERVAL_FILTERS or variable in ["Clash", "Search"]:
+                # the interval index, the clash detector and the search index return the matching rows themselves
+                matched = self.__getMatched(variable, value)
+                plan.append((variable, value, None, matched, len(matched)))
+            else:
+                column, bounds = self.__getBounds(variable, value)
+                bounds = [(low, high) for low, high in bounds if low < high]
+                plan.append((variable, value, column, bounds, sum(high - low for low, high in bounds)))
+        plan.sort(key=lambda step: step[4])
+        return plan
+
+    def __getMatched(self, variable, value):
+        # the rows of one of these predicates are the result of a query of it alone, so they share the query cache
+        # and e.g. the facet counts of every option reuse one search instead of running it per option
+        key = self.__getQueryKey({variable: value})
+        if key in self.__cache:
+            self.__cache.move_to_end(key)
+            self.__cacheHits += 1
+            return self.__cache[key]
+        self.__cacheMisses += 1
+        matched = sorted(self.__getMatchedRows(variable, value))
+        self.__cacheRows(key, matched)
+        return matched
+
+    def __getIntervals(self, name):
+        # Date_Time holds each session's date and times, Time only its times of day
+        if name not in self.__intervals:
+            starts = []
+            ends = []
+            for schedule in self.__schedules:
+                date = schedule.getItem("Date") if name == "Date_Time" else None
+                start = getMinutes(date, schedule.getItem("Start_Time"))
+                end = getMinutes(date, schedule.getItem("End_Time"))
+                starts.append(start)
+                # sessions ending past midnight
+                ends.append(end + 1440 if end < start else end)
+            self.__intervals[name] = IntervalIndex(starts, ends)
+        return self.__intervals[name]
+
+    def __getMatchedRows(self, variable, value):
+        # Active_At: a datetime, Overlap: a (start, end) pair of datetimes, Time_Window: a (start, end) pair of times on any date
+        # Clash: "Location", "Lecturer" or both joined by &&&, Search: text found in any of the SEARCH_COLUMNS
+        match variable:
+            case "Search":
+                rows = set()
+                for column in SEARCH_COLUMNS:
+                    order = self.__getOrder(column)
+                    runs = self.__runs[column]
+                    for _, rank in self.__getSearchIndex(column).getMatches(value):
+                        rows.update(order[runs[rank]:runs[rank+1]])
+                return list(rows)
+            case "Clash":
+                rows = set()
+                for column in value.split("&&&"):
+                    copies = self.__getClashCopies(column)
+                    for pair in self.__getClashPairs(column):
+                        for row in pair:
+                            rows.update(copies.get(row, [row]))
+                return list(rows)
+            case "Active_At":
+                return self.__getIntervals("Date_Time").getActiveAt(getMinutes(value, value))
+            case "Overlap":
+                start, end = value
+                return self.__getIntervals("Date_Time").getOverlapping(getMinutes(start, start), getMinutes(end, end))
+            case "Time_Window":
+                # an end before the start wraps past midnight, an end equal to the start is a single moment
+                low, high = getWindow(*value)
+                # sessions recur every day, so also match the window against the day before and after
+                rows = set()
+                for shift in [-1440, 0, 1440]:
+                    rows.update(self.__getIntervals("Time").getOverlapping(low + shift, high + shift))
+                return list(rows)
+
+    def __getClashPairs(self, variable):
+        # sessions sharing a Location or Lecturer at overlapping times, built once per loaded data
+        # a session shared by several cohorts is listed in each cohort's file, those copies are one session
+        # so only the first copy takes part in the sweep and the others are kept in __copies
+        if variable not in self.__clashes:
+            intervals = self.__getIntervals("Date_Time")
+            starts = intervals.getStarts()
+            ends = intervals.getEnds()
+            # the copies also share the other column, a lecturer in two rooms at once is a clash
+            other = "Location" if variable == "Lecturer" else "Lecturer"
+            clashes = []
+            copies = {}
+            for _, group in self.__iterGroups(variable):
+                sessions:dict[tuple, list[int]] = {}
+                for row in group:
+                    schedule = self.__schedules[row]
+                    sessions.setdefault((schedule.getItem("Module_Code"), schedule.getItem("Class_Type"), schedule.getItem(other), starts[row], ends[row]), []).append(row)
+                for rows in sessions.values():
+                    if len(rows) > 1:
+                        copies[rows[0]] = rows
+                clashes.extend(findClashes([rows[0] for rows in sessions.values()], starts, ends))
+            self.__clashes[variable] = clashes
+            self.__copies[variable] = copies
+        return self.__clashes[variable]
+
+    def __iterGroups(self, variable):
+        # (value, rows) for every value of the column in sorted order, rows without a room or lecturer are left out
+        order = self.__getOrder(variable)
+        keys = self.__keys[variable]
+        low = 0
+        for high in range(1, len(order) + 1):
+            if high == len(order) or keys[order[high]] != keys[order[low]]:
+                if keys[order[low]].strip() != "":
+                    yield keys[order[low]], order[low:high]
+                low = high
+
+    def __getClashCopies(self, variable):
+        # first copy of a shared session: all of its rows
+        self.__getClashPairs(variable)
+        return self.__copies[variable]
+
+    def __getSearchIndex(self, column):
+        if column not in self.__searches:
+            self.__getOrder(column)
+            runs = self.__runs[column]
+            self.__searches[column] = SearchIndex(self.__values[column], [runs[value+1] - runs[value] for value in range(len(runs) - 1)])
+        return self.__searches[column]
+
+    def search(self, text, limit=20, columns=SEARCH_COLUMNS):
+        # (column, value, number of rows) of the values containing text, best matches first
+        matches = []
+        for column in columns:
+            index = self.__getSearchIndex(column)
+            values = self.__values[column]
+            for score, value in index.getMatches(text):
+                matches.append((score, str(values[value]), column, values[value]))
+        matches.sort()
+        return [(column, value, -score[1]) for score, _, column, value in matches[:limit]]
+
+    def getClashes(self, variable):
+        # every clashing pair of loaded schedules on variable ("Location" or "Lecturer")
+        return [(self.__schedules[first], self.__schedules[second]) for first, second in self.__getClashPairs(variable)]
+
+    def __getOccupancy(self, variable):
+        # per Location or Lecturer, built once per loaded data
+        if variable not in self.__occupancy:
+            intervals = self.__getIntervals("Date_Time")
+            occupancy = OccupancyIndex()
+            for value, rows in self.__iterGroups(variable):
+                occupancy.addValue(value, rows, intervals.getStarts(), intervals.getEnds())
+            self.__occupancy[variable] = occupancy
+        return self.__occupancy[variable]
+
+    def __getRooms(self):
+        # the largest planned size a room has held stands for its capacity, with the zone it was booked in
+        if len(self.__rooms) == 0:
+            for schedule in self.__schedules:
+                location = schedule.getItem("Location")
+                if location.strip() != "":
+                    size, zone = self.__rooms.get(location, (0, schedule.getItem("Zone")))
+                    self.__rooms[location] = (max(size, schedule.getItem("Size")), zone)
+        return self.__rooms
+
+    def getFreeRooms(self, start_date, end_date, start_time, end_time, size=None, zone=None):
+        # (location, capacity, zone) of every room free between start_time and end_time on all dates from start_date to end_date
+        occupancy = self.__getOccupancy("Location")
+        days = range(start_date.toordinal(), end_date.toordinal() + 1)
+        low, high = getWindow(start_time, end_time)
+        if high == low:
+            # a single moment, as in Time_Window
+            high += 1
+        rooms = []
+        for location, (capacity, room_zone) in sorted(self.__getRooms().items()):
+            if (size == None or capacity >= size) and (zone == None or room_zone == zone):
+                if all(occupancy.isFree(location, day*1440 + low, day*1440 + high) for day in days):
+                    rooms.append((location, capacity, room_zone))
+        return rooms
+
+    def getFreeSlots(self, lecturer, start_date, end_date, start_time, end_time, duration=None):
+        # (start, end) datetimes in which the lecturer has nothing booked, within start_time and end_time of each date
+        occupancy = self.__getOccupancy("Lecturer")
+        low, high = getWindow(start_time, end_time)
+        minimum = 1 if duration == None else duration.seconds // 60
+        slots = []
+        for day in range(start_date.toordinal(), end_date.toordinal() + 1):
+            for start, end in occupancy.getFreeSlots(lecturer, day*1440 + low, day*1440 + high):
+                if end - start >= minimum:
+                    slots.append((datetime.fromordinal(start // 1440) + timedelta(minutes=start % 1440), datetime.fromordinal(end // 1440) + timedelta(minutes=end % 1440)))
+        return slots
+
+    def __filterRows(self, rows, column, bounds):
+        if column == None:
+            # bounds are the rows matched by an interval index or the clash detector
+            if len(rows) == len(self.__schedules):
+                return bounds, "rows"
+            matched = set(bounds)
+            return list(compress(rows, map(matched.__contains__, rows))), "rows"
+        order = self.__orders[column]
+        if len(rows) == len(order):
+            # answered by the index alone
+            return list(chain.from_iterable(order[low:high] for low, high in bounds)), "index"
+        # intersecting with the index would cost more than probing the ranks of the remaining rows
+        rank = self.__ranks[column]
+        ranks = set()
+        for low, high in bounds:
+            ranks.update(range(rank[order[low]], rank[order[high-1]]+1))
+        return list(compress(rows, map(ranks.__contains__, map(rank.__getitem__, rows)))), "scan"
+
+    def control(self, sortBy, top=None, **query):
+        # a query that only narrows the previous one starts from its rows, any other from all loaded schedules
+        previousQuery = self.__query
+        previousRows = self.__processedRows
+        self.resetProcessed()
+
+        # filter, repeated queries are answered from the cache
+        key = self.__getQueryKey(query)
+        self.__query = dict(key[1])
+        refinement = self.__getRefinement(previousQuery, self.__query)
+        if len(key[1]) == 0:
+            self.__plan = []
+        elif key in self.__cache:
+            start = time.perf_counter()
+            self.__cache.move_to_end(key)
+            self.__cacheHits += 1
+            self.__processedRows = list(self.__cache[key])
+            self.__plan = [{"variable": None, "value": None, "estimate": len(self.__processedRows), "access": "cache", "rows": len(self.__processedRows), "seconds": time.perf_counter() - start}]
+        else:
+            self.__cacheMisses += 1
+            self.__plan = []
+            if refinement != None:
+                rows = self.__queryRows(self.__planQuery(refinement), self.__plan, previousRows)
+            else:
+                rows = self.__queryRows(self.__planQuery(query), self.__plan)
+            # back in row order, so that rows with equal sort keys come out the same however they were found
+            self.__processedRows = sorted(rows)
+            self.__cacheRows(key, self.__processedRows)
 
         # sort
-        self.sortProcessed(sortBy)
-
-    def sortProcessed(self, sortBy, descending=False):
-        self.__processedSchedules = self.sort(self.__processedSchedules, sortBy)
-        if descending == True:
-            self.__processedSchedules.reverse()
+        self.sortProcessed(sortBy, top=top)
+
+    def __getRefinement(self, previous, query):
+        # the predicates of query that are new or narrower than in previous,
+        # None when previous had no filters or query drops or widens any of them
+        if len(previous) == 0:
+            return None
+        refinement = {}
+        for variable in previous:
+            if variable not in query:
+                return None
+        for variable, value in query.items():
+            if variable not in previous:
+                refinement[variable] = value
+            elif value != previous[variable]:
+                if not self.__isNarrower(variable, value, previous[variable]):
+                    return None
+                refinement[variable] = value
+        return refinement
+
+    def __isNarrower(self, variable, value, previous):
+        match variable:
+            case "Start_Date":
+                return value >= previous
+            case "End_Date":
+                return value <= previous
+            case "Search":
+                # longer text containing the previous text
+                return previous.lower() in value.lower()
+            case "Overlap" | "Time_Window":
+                # anything overlapping a window also overlaps every window around it
+                return previous[0] < previous[1] and previous[0] <= value[0] <= value[1] <= previous[1]
+            case _:
+                # &&& selections of fewer values
+                return isinstance(value, str) and isinstance(previous, str) and set(value.split("&&&")) <= set(previous.split("&&&"))
+
+    def __getBitmapIndex(self, column):
+        if column not in self.__bitmaps:
+            self.__bitmaps[column] = BitmapIndex(self.__orders[column], self.__ranks[column])
+        return self.__bitmaps[column]
+
+    def __queryBitmap(self, plan, steps):
+        # the intersection of the categorical predicates, None when there are none
+        bitmap = None
+        for variable, value, column, bounds, estimate in plan:
+            if variable in BITMAP_COLUMNS:
+                start = time.perf_counter()
+                matched = self.__getBitmapIndex(column).getBitmap(bounds)
+                bitmap = matched if bitmap == None else bitmap & matched
+                steps.append({"variable": variable, "value": value, "estimate": estimate, "access": "bitmap", "rows": bitmap.bit_count(), "seconds": time.perf_counter() - start})
+        return bitmap
+
+    def __queryRows(self, plan, steps, rows=None):
+        # categorical predicates are intersected as bitmaps before the rest run by selectivity,
+        # when refining given rows every predicate probes them instead
+        refining = rows != None
+        if not refining:
+            rows = range(len(self.__schedules))
+            bitmap = self.__queryBitmap(plan, steps)
+            if bitmap != None:
+                start = time.perf_counter()
+                rows = getBitmapRows(bitmap)
+                steps[-1]["seconds"] += time.perf_counter() - start
+        for variable, value, column, bounds, estimate in plan:
+            if refining or variable not in BITMAP_COLUMNS:
+                start = time.perf_counter()
+                if len(rows) == 0:
+                    access = "skip"
+                else:
+                    rows, access = self.__filterRows(rows, column, bounds)
+                steps.append({"variable": variable, "value": value, "estimate": estimate, "access": access, "rows": len(rows), "seconds": time.perf_counter() - start})
+        return rows
+
+    def getFacetCounts(self, variable, **query):
+        # value: number of rows matching the query, for every value of the column
+        # the column's own predicate is left out so that the values it could be switched to are counted too
+        plan = self.__planQuery({key: value for key, value in query.items() if key != variable})
+        self.__getOrder(variable)
+        values = self.__values[variable]
+        runs = self.__runs[variable]
+        if len(plan) == 0:
+            counts = [runs[value+1] - runs[value] for value in range(len(values))]
+        elif all(step[0] in BITMAP_COLUMNS for step in plan) and variable in BITMAP_COLUMNS and len(values) <= FACET_BITMAP_LIMIT:
+            # intersect the query with the bitmap of each value, the rows are never visited
+            bitmap = self.__queryBitmap(plan, [])
+            index = self.__getBitmapIndex(variable)
+            counts = [(index.getBitmap([(runs[value], runs[value+1])]) & bitmap).bit_count() for value in range(len(values))]
+        else:
+            ranks = Counter(map(self.__ranks[variable].__getitem__, self.__queryRows(plan, [])))
+            counts = [ranks[value] for value in range(len(values))]
+        return dict(zip(values, counts))
 
-    def getProcessed(self):
-        return self.__processedSchedules
+    def __getQueryKey(self, query):
+        # the same filters in any order, with &&& selections in any order, give the same key
+        items = []
+        for variable, value in sorted(query.items()):
+            if value != None:
+                if isinstance(value, str) and "&&&" in value:
+                    value = "&&&".join(sorted(set(value.split("&&&"))))
+                items.append((variable, value))
+        return (self.__version, tuple(items))
+
+    def __cacheRows(self, key, rows):
+        rows = array("i", rows)
+        size = CACHE_ENTRY_BYTES + rows.itemsize * len(rows)
+        if size > self.__cacheLimit:
+            return
+        # a query of a single matched-rows predicate has the key its rows were already stored under
+        if key in self.__cache:
+            self.__cacheBytes -= CACHE_ENTRY_BYTES + self.__cache[key].itemsize * len(self.__cache[key])
+        self.__cache[key] = rows
+        self.__cache.move_to_end(key)
+        self.__cacheBytes += size
+        self.__evictCache()
+
+    def __evictCache(self):
+        while self.__cacheBytes > self.__cacheLimit:
+            _, evicted = self.__cache.popitem(last=False)
+            self.__cacheBytes -= CACHE_ENTRY_BYTES + evicted.itemsize * len(evicted)
+            self.__cacheEvictions += 1
+
+    def getCacheStats(self):
+        return {"hits": self.__cacheHits, "misses": self.__cacheMisses, "evictions": self.__cacheEvictions, "entries": len(self.__cache), "bytes": self.__cacheBytes, "limit": self.__cacheLimit}
+
+    def setCacheLimit(self, cacheLimit):
+        self.__cacheLimit = cacheLimit
+        self.__evictCache()
+
+    def getPlan(self):
+        # the predicates of the last control() in the order they ran
+        return [dict(step) for step in self.__plan]
+
+    def resetProcessed(self):
+        # a range stands for all rows until the first filter or sort replaces it with a list
+        self.__processedRows:range|list[int] = range(len(self.__schedules))
+        self.__topRows:list[int] = []
+        self.__pendingKeys:list[tuple] = []
+        # the normalized filters the processed rows were selected by
+        self.__query:dict = {}
+        self.__facets:Optional[dict[str, list]] = None
+        self.__moduleSet:list[Schedule] = []
+
+    def sortProcessed(self, sortBy, descending=False, top=None):
+        self.sortProcessedBy([(sortBy, descending)], top)
+
+    def sortProcessedBy(self, keys, top=None):
+        # keys: [(column, descending), ...] most significant first
+        # with top only the first rows are put in order, the rest is sorted when getProcessed first needs it
+        if len(self.__pendingKeys) > 0:
+            # sorting the unsorted rows by (keys, pending keys) equals a stable sort of the pending order
+            columns = [column for column, _ in keys]
+            keys = keys + [key for key in self.__pendingKeys if key[0] not in columns]
+            self.__pendingKeys = []
+        if top != None and top < len(self.__processedRows):
+            self.__topRows = self.__getTopRows(self.__processedRows, keys, top)
+            self.__pendingKeys = keys
+        else:
+            # one stable pass per key from the least significant
+            for sortBy, descending in reversed(keys):
+                self.__processedRows = self.__sortRows(self.__processedRows, sortBy, descending)
+
+    def __getTopRows(self, rows, keys, top):
+        # only rows tying with or ahead of the top-th value of the first key can be among the first top rows
+        sortBy, descending = keys[0]
+        self.__getOrder(sortBy)
+        rank = self.__ranks[sortBy]
+        ranks = list(map(rank.__getitem__, rows))
+        counts = Counter(ranks)
+        found = 0
+        for threshold in sorted(counts, reverse=descending):
+            found += counts[threshold]
+            if found >= top:
+                break
+        # every row ahead of the threshold, then the tying rows, of which a single key only needs the first few
+        ahead = threshold.__lt__ if descending else threshold.__gt__
+        candidates = list(compress(rows, map(ahead, ranks)))
+        tying = compress(rows, map(threshold.__eq__, ranks))
+        candidates.extend(islice(tying, top - len(candidates)) if len(keys) == 1 else tying)
+        for sortBy, descending in reversed(keys):
+            candidates = self.__sortRows(candidates, sortBy, descending)
+        return candidates[:top]
+
+    def __finishSort(self):
+        if len(self.__pendingKeys) > 0:
+            keys = self.__pendingKeys
+            self.__pendingKeys = []
+            self.sortProcessedBy(keys)
+
+    def getProcessed(self, count=None, start=0):
+        # count schedules in order from start, all of them by default
+        if len(self.__pendingKeys) > 0 and count != None and start + count <= len(self.__topRows):
+            return [self.__schedules[row] for row in self.__topRows[start:start+count]]
+        self.__finishSort()
+        end = None if count == None else start + count
+        return [self.__schedules[row] for row in self.__processedRows[start:end]]
+
+    def getProcessedCount(self):
+        return len(self.__processedRows)
+
+    def __getDistinct(self, variable):
+        # the sorted distinct values of the processed rows, read off the dense ranks in linear time
+        self.__getOrder(variable)
+        values = self.__values[variable]
+        return [values[rank] for rank in sorted(set(map(self.__ranks[variable].__getitem__, self.__processedRows)))]
+
+    def __getFacets(self):
+        # every filter option's values and the module set are built together and kept until the rows are filtered again
+        if self.__facets == None:
+            self.__facets = {variable: self.__getDistinct(variable) for variable in FACET_COLUMNS if variable != "Description"}
+            # the first processed row of each description stands for its module
+            self.__getOrder("Description")
+            rank = self.__ranks["Description"]
+            values = self.__values["Description"]
+            firsts = dict(zip(map(rank.__getitem__, reversed(self.__processedRows)), reversed(self.__processedRows)))
+            self.__facets["Description"] = [values[value] for value in sorted(firsts)]
+            self.__moduleSet = [self.__schedules[firsts[value]] for value in sorted(firsts)]
+        return self.__facets
 
     def getValuesSet(self, variable):
-        itemsSet = []
-        for schedule in self.sort(self.__processedSchedules, variable):
-            value = schedule.getItem(variable)
-            if value not in itemsSet:
-                itemsSet.append(value)
-        return itemsSet
-    
+        facets = self.__getFacets()
+        if variable not in facets:
+            facets[variable] = self.__getDistinct(variable)
+        return list(facets[variable])
+
     def getModuleSet(self):
-        itemsSet = []
-        moduleSet = []
-        for schedule in self.sort(self.__processedSchedules, "Description"):
-            value = schedule.getItem("Description")
-            if value not in itemsSet:
-                itemsSet.append(value)
-                moduleSet.append(schedule)
-        return moduleSet
-    
+        self.__getFacets()
+        return list(self.__moduleSet)
+
     def getItems(self, variable):
-        items = []
-        for schedule in self.sort(self.__processedSchedules, variable):
-            value = schedule.getItem(variable)
-            items.append(value)
-        return items
+        sortedRows = self.__sortRows(self.__processedRows, variable)
+        keys = self.__keys[variable]
+        return [keys[row] for row in sortedRows]
     
     def getMaxDuplicate(self):
         items = self.getItems("Date")
@@ -412,6 +1824,16 @@ class TimetableBuilder:
             table.setStyle(style)
             pdf.build([table])
 
+        elif format == "clashes":
+            # every double booked room and lecturer among the loaded schedules, one pair per line
+            fields = ["Cohort", "Module_Code", "Class_Type", "Date_str", "Start_Time_str", "End_Time_str", "Location", "Lecturer"]
+            with open(f"{path}/{name}.csv", "w", newline="") as csv_file:
+                writer = csv.writer(csv_file)
+                writer.writerow(["Clash", "Value"] + [f"First {field}" for field in fields] + [f"Second {field}" for field in fields])
+                for variable in ["Location", "Lecturer"]:
+                    for first, second in self.controller.getClashes(variable):
+                        writer.writerow([variable, first.getItem(variable)] + [first.getItem(field) for field in fields] + [second.getItem(field) for field in fields])
+
     # calculate
     def __getPosition(self, row, column, position):
         match position:
@@ -711,7 +2133,8 @@ class TimetableBuilder:
 class App(customtkinter.CTk):
     def __init__(self):
         super().__init__()
-        self.handler = ScheduleHandler()
+        # serial, the Schedules are still built in this process so workers only help on many cores (see benchmark.py workers)
+        self.handler = ScheduleHandler(cacheDirectory=getCacheDirectory())
         self.controller = ScheduleController(self.handler)
         self.__reset_click_count()
 
@@ -762,6 +2185,12 @@ class App(customtkinter.CTk):
         self.remove_button = customtkinter.CTkButton(self.F_sidebar_bottom, width=28, text="Remove",font=customtkinter.CTkFont(size=12, weight="bold"), fg_color="transparent", border_width=2, text_color=("gray10", "#DCE4EE"), command=self.removeButtonPressed)
         self.remove_button.grid(row=0, column=0, sticky='w', padx=5, pady=10)
 
+                # sidebar inner bottom (Watch Directory)
+        self.watched = tkinter.IntVar()
+        self.watcher = None
+        self.watch_check = customtkinter.CTkCheckBox(self.F_sidebar_bottom, text="Watch", variable=self.watched, onvalue=1, offvalue=0, width=15, height=15, command=self.__watchChecked)
+        self.watch_check.grid(row=0, column=3, sticky='e', padx=5, pady=10)
+
                 # sidebar inner bottom (Files Table)
         self.files_table = ttk.Treeview(self.F_sidebar_bottom, columns=('No', "File", "Valid"), show='headings', padding=(10,10,5,5))
         self.files_table.grid(row=1, column=0, sticky='nswe', columnspan=4, padx=5, pady=(0,10))
@@ -840,8 +2269,10 @@ class App(customtkinter.CTk):
 
         self.__load_module_code_option(init=True)
 
-        self.label = customtkinter.CTkLabel(self.tabview.tab("Module"), text="Description")
-        self.label.grid(row=0, column=7)
+        # type-ahead for the description list only, the rows are filtered by the descriptions selected in it
+        self.search_entry = customtkinter.CTkEntry(self.tabview.tab("Module"), placeholder_text="Search Description", height=15, width=200)
+        self.search_entry.grid(row=0, column=7, padx=5, sticky='we')
+        self.search_entry.bind("<KeyRelease>", self.__search_typed)
 
         self.__load_description_option(init=True)
 
@@ -929,6 +2360,10 @@ class App(customtkinter.CTk):
 
         self.__load_zone_option(init=True)
 
+        self.clashed = tkinter.IntVar()
+        self.clash_check = customtkinter.CTkCheckBox(self.tabview.tab("Lecture Room"), text="Clashes Only", variable=self.clashed, onvalue=1, offvalue=0, width=15, height=15)
+        self.clash_check.grid(row=2, column=0, sticky="w")
+
         ####################################################################################################
 
                 # main inner (Schedule Table)
@@ -972,6 +2407,16 @@ class App(customtkinter.CTk):
         self.schedule_table.heading("Zone", text="Zone", command=self.__zone_clicked)
 
         self.schedule_table.grid(row=1, column=0, sticky='nswe', pady=(10,0))
+
+        self.page_size = 200
+        self.facet_labels = {}
+        self.count_job = None
+        self.shown_rows = 0
+        self.schedule_table.configure(yscrollcommand=self.__schedule_scrolled)
+
+        self.sort_keys = []
+        self.heading_variables = {"Cohort": "Cohort", "Study Mode": "Study_Mode", "Lecturer": "Lecturer", "Module Code": "Module_Code", "Description": "Description", "Date": "Date", "Day": "Day", "Start Time": "Start_Time", "End Time": "End_Time", "Duration": "Duration", "Class Type": "Class_Type", "Location": "Location", "Size": "Size", "Zone": "Zone"}
+        self.schedule_table.bind("<Shift-Button-1>", self.__heading_shift_clicked)
         
         ##################################################
 
@@ -994,6 +2439,9 @@ class App(customtkinter.CTk):
         self.export_button = customtkinter.CTkButton(self.F_main_confirm, width=28, text="Export",font=customtkinter.CTkFont(size=12, weight="bold"), fg_color="transparent", border_width=2, text_color=("gray10", "#DCE4EE"), command=self.exportButtonPressed)
         self.export_button.grid(row=0, column=0, sticky='sw', padx=(0,5))
 
+        self.free_button = customtkinter.CTkButton(self.F_main_confirm, width=28, text="Free Rooms",font=customtkinter.CTkFont(size=12, weight="bold"), fg_color="transparent", border_width=2, text_color=("gray10", "#DCE4EE"), command=self.freeButtonPressed)
+        self.free_button.grid(row=0, column=1, sticky='sw', padx=(0,5))
+
         self.reload_button = customtkinter.CTkButton(self.F_main_confirm, width=28, text="Reload",font=customtkinter.CTkFont(size=12, weight="bold"), fg_color="transparent", border_width=2, text_color=("gray10", "#DCE4EE"), command=self.reloadButtonPressed)
         self.reload_button.grid(row=0, column=1, sticky='se', padx=(0,5))
 
@@ -1028,8 +2476,24 @@ class App(customtkinter.CTk):
         self.update()
 
     def __loadSchedules(self):
-        for index, schedule in enumerate(self.controller.getProcessed()):
-            no = index + 1
+        # only the first page has to be in order, more rows are added while the table is scrolled
+        self.shown_rows = 0
+        self.__loadMoreSchedules()
+        if self.controller.getProcessedCount() == 0 and len(self.handler.getFiles()) != 0:
+            self.errorPopup("No Schedules Found!")
+
+    def __loadMoreSchedules(self):
+        schedules = self.controller.getProcessed(self.page_size, start=self.shown_rows)
+        self.__insertSchedules(schedules, start=self.shown_rows)
+        self.shown_rows += len(schedules)
+
+    def __schedule_scrolled(self, first, last):
+        if float(last) > 0.9 and self.shown_rows < self.controller.getProcessedCount():
+            self.__loadMoreSchedules()
+
+    def __insertSchedules(self, schedules, start=0):
+        for index, schedule in enumerate(schedules):
+            no = start + index + 1
             cohort = schedule.getItem("Cohort")
             study_mode = schedule.getItem("Study_Mode")
             lecturer = schedule.getItem("Lecturer")
@@ -1050,8 +2514,6 @@ class App(customtkinter.CTk):
             data = (no, cohort, study_mode, lecturer, module_code, description, date, day, start_time, end_time, duration, class_type, location, size, zone)
 
             self.schedule_table.insert(parent="", index=tkinter.END, values=data)
-        if len(self.controller.getProcessed()) == 0 and len(self.handler.getFiles()) != 0:
-            self.errorPopup("No Schedules Found!")
 
 
     # load combobox
@@ -1060,7 +2522,7 @@ class App(customtkinter.CTk):
             self.cohort_option.destroy()
         self.cohort_set = self.controller.getValuesSet("Cohort")
         self.cohort_set.insert(0, "No Filter")
-        self.cohort_option = customtkinter.CTkComboBox(self.tabview.tab("Module"), height=15, values=self.cohort_set)
+        self.cohort_option = customtkinter.CTkComboBox(self.tabview.tab("Module"), height=15, values=self.cohort_set, command=self.__filter_changed)
         self.cohort_option.set("No Filter")
         self.cohort_option.grid(row=0, column=6, sticky='w')
 
@@ -1069,7 +2531,7 @@ class App(customtkinter.CTk):
             self.study_mode_option.destroy()
         self.study_mode_set = self.controller.getValuesSet("Study_Mode")
         self.study_mode_set.insert(0, "No Filter")
-        self.study_mode_option = customtkinter.CTkComboBox(self.tabview.tab("Module"), height=15, values=self.study_mode_set)
+        self.study_mode_option = customtkinter.CTkComboBox(self.tabview.tab("Module"), height=15, values=self.study_mode_set, command=self.__filter_changed)
         self.study_mode_option.set("No Filter")
         self.study_mode_option.grid(row=1, column=6, sticky='w')
 
@@ -1078,7 +2540,7 @@ class App(customtkinter.CTk):
             self.lecturer_option.destroy()
         self.lecturer_set = self.controller.getValuesSet("Lecturer")
         self.lecturer_set.insert(0, "No Filter")
-        self.lecturer_option = customtkinter.CTkComboBox(self.tabview.tab("Module"), height=15, values=self.lecturer_set)
+        self.lecturer_option = customtkinter.CTkComboBox(self.tabview.tab("Module"), height=15, values=self.lecturer_set, command=self.__filter_changed)
         self.lecturer_option.set("No Filter")
         self.lecturer_option.grid(row=2, column=6, sticky='w')
 
@@ -1087,7 +2549,7 @@ class App(customtkinter.CTk):
             self.module_code_option.destroy()
         self.module_code_set = self.controller.getValuesSet("Module_Code")
         self.module_code_set.insert(0, "No Filter")
-        self.module_code_option = customtkinter.CTkComboBox(self.tabview.tab("Module"), height=15, values=self.module_code_set)
+        self.module_code_option = customtkinter.CTkComboBox(self.tabview.tab("Module"), height=15, values=self.module_code_set, command=self.__filter_changed)
         self.module_code_option.set("No Filter")
         self.module_code_option.grid(row=3, column=6, sticky='w')
 
@@ -1105,7 +2567,7 @@ class App(customtkinter.CTk):
             self.location_option.destroy()
         self.location_set = self.controller.getValuesSet("Location")
         self.location_set.insert(0, "No Filter")
-        self.location_option = customtkinter.CTkComboBox(self.tabview.tab("Lecture Room"), height=15, values=self.location_set)
+        self.location_option = customtkinter.CTkComboBox(self.tabview.tab("Lecture Room"), height=15, values=self.location_set, command=self.__filter_changed)
         self.location_option.set("No Filter")
         self.location_option.grid(row=0, column=7, sticky='w')
 
@@ -1125,7 +2587,7 @@ class App(customtkinter.CTk):
 
         self.zone_set = self.controller.getValuesSet("Zone")
         self.zone_set.insert(0, "No Filter")
-        self.zone_option = customtkinter.CTkComboBox(self.tabview.tab("Lecture Room"), height=15, values=self.zone_set)
+        self.zone_option = customtkinter.CTkComboBox(self.tabview.tab("Lecture Room"), height=15, values=self.zone_set, command=self.__filter_changed)
         self.zone_option.set("No Filter")
         self.zone_option.grid(row=2, column=7, sticky='w')
 
@@ -1157,6 +2619,7 @@ class App(customtkinter.CTk):
         self.day_option = Listbox(self.tabview.tab("Date & Time"), selectmode="multiple", height=2, width=15)
         for value in self.day_set:
             self.day_option.insert(tkinter.END, value)
+        self.day_option.bind("<<ListboxSelect>>", self.__filter_changed)
         self.day_option.grid(row=1, column=7, rowspan=7, pady=(0,5), sticky='ns')
 
     def __load_class_type_option(self, init=False):
@@ -1167,20 +2630,65 @@ class App(customtkinter.CTk):
         self.class_type_option = Listbox(self.tabview.tab("Lecture Room"), selectmode="multiple", height=2)
         for value in self.class_type_set:
             self.class_type_option.insert(tkinter.END, value)
+        self.class_type_option.bind("<<ListboxSelect>>", self.__filter_changed)
         self.class_type_option.grid(row=1, column=4, rowspan=2, pady=(0,5), sticky='nswe')
 
     def __load_description_option(self, init=False):
         if init == False:
             self.description_option.destroy()
+            self.search_entry.delete(0, tkinter.END)
         
+        # selections are kept apart from the listbox, which only shows the descriptions matching the search
+        self.description_selected = set()
         self.description_set = self.controller.getValuesSet("Description")
         self.description_option = Listbox(self.tabview.tab("Module"), selectmode="multiple", height=2, width=30)
         for value in self.description_set:
             self.description_option.insert(tkinter.END, value)
+        self.description_option.bind("<<ListboxSelect>>", self.__description_selected)
         self.description_option.grid(row=1, column=7, rowspan=3, padx=5, pady=(0,5), sticky='nswe')
 
+    def __description_selected(self, *args):
+        selection = self.description_option.curselection()
+        for index, value in enumerate(self.description_option.get(0, tkinter.END)):
+            if index in selection:
+                self.description_selected.add(value)
+            else:
+                self.description_selected.discard(value)
+        self.__update_facet_counts()
+
+    def __search_typed(self, event):
+        # the listbox follows every keystroke, its greyed out values are only redone once typing pauses
+        self.__fill_descriptions()
+        if self.count_job != None:
+            self.after_cancel(self.count_job)
+        self.count_job = self.after(300, self.__search_paused)
+
+    def __search_paused(self):
+        self.count_job = None
+        self.__update_facet_counts()
+
+    def __fill_descriptions(self):
+        text = self.search_entry.get().strip()
+        if text == "":
+            values = self.description_set
+        else:
+            values = [value for _, value, _ in self.controller.search(text, limit=None, columns=["Description"])]
+        self.description_option.delete(0, tkinter.END)
+        for index, value in enumerate(values):
+            self.description_option.insert(tkinter.END, value)
+            if value in self.description_selected:
+                self.description_option.selection_set(index)
+
     # reload filters
-    def __reload_filters(self):
+    def __reload_filters(self, keep=False):
+        # keep carries the chosen values over to the new options, for schedules that changed under the filters
+        if keep:
+            chosen = {name: self.__option_value(getattr(self, f"{name}_option")) for name in ["cohort", "study_mode", "lecturer", "module_code", "duration", "start_time", "end_time", "location", "size", "zone"]}
+            days = [self.day_option.get(index) for index in self.day_option.curselection()]
+            class_types = [self.class_type_option.get(index) for index in self.class_type_option.curselection()]
+            descriptions = self.description_selected
+            search = self.search_entry.get()
+
         self.__load_cohort_option()
         self.__load_study_mode_option()
         self.__load_lecturer_option()
@@ -1197,7 +2705,18 @@ class App(customtkinter.CTk):
         self.__load_size_option()
         self.__load_zone_option()
 
-        if (self.checked.get() == 1):
+        if keep:
+            for name, value in chosen.items():
+                if value in getattr(self, f"{name}_set"):
+                    getattr(self, f"{name}_option").set(value)
+            for listbox, selected in [(self.day_option, days), (self.class_type_option, class_types)]:
+                for index, value in enumerate(listbox.get(0, tkinter.END)):
+                    if value in selected:
+                        listbox.selection_set(index)
+            self.description_selected = descriptions & set(self.description_set)
+            self.search_entry.insert(0, search)
+            self.__fill_descriptions()
+        elif (self.checked.get() == 1):
             self.start_date_option.delete(0, tkinter.END)
             self.start_date_option.insert(0, "dd/mm/yyyy")
             self.end_date_option.delete(0, tkinter.END)
@@ -1206,7 +2725,69 @@ class App(customtkinter.CTk):
             self.date_option.delete(0, tkinter.END)
             self.date_option.insert(0, "dd/mm/yyyy")
 
+        self.__update_facet_counts()
+
+    # facet counts
+    def __facet_options(self):
+        return [("Cohort", self.cohort_option), ("Study_Mode", self.study_mode_option), ("Lecturer", self.lecturer_option), ("Module_Code", self.module_code_option), ("Location", self.location_option), ("Zone", self.zone_option)]
+
+    def __facet_listboxes(self):
+        return [("Description", self.description_option), ("Day_str", self.day_option), ("Class_Type", self.class_type_option)]
+
+    def __option_value(self, option):
+        # comboboxes show "value (count)", the filter needs the value
+        label = option.get()
+        return self.facet_labels.get(label, label)
+
+    def __filter_changed(self, *args):
+        self.__update_facet_counts()
+
+    def __update_facet_counts(self):
+        # the number of schedules each option would leave, given the other filters chosen so far
+        query = self.__getQuery()
+        selections = [self.__option_value(option) for _, option in self.__facet_options()]
+        self.facet_labels = {}
+        for (variable, option), selected in zip(self.__facet_options(), selections):
+            counts = self.controller.getFacetCounts(variable, **query)
+            labels = ["No Filter"]
+            for value, count in counts.items():
+                label = f"{value} ({count})"
+                self.facet_labels[label] = value
+                labels.append(label)
+                if value == selected:
+                    selected = label
+            option.configure(values=labels)
+            option.set(selected)
+        for variable, listbox in self.__facet_listboxes():
+            counts = self.controller.getFacetCounts(variable, **query)
+            for index, value in enumerate(listbox.get(0, tkinter.END)):
+                listbox.itemconfig(index, foreground="black" if counts.get(value, 0) > 0 else "grey")
+
     # header sort
+    def __sortBy(self, variable, descending=False):
+        self.sort_keys = [(variable, descending)]
+        self.controller.sortProcessed(variable, descending, top=self.page_size)
+
+    def __heading_shift_clicked(self, event):
+        # shift-click adds the column as a further sort key, or flips its direction if it is one already
+        if self.schedule_table.identify_region(event.x, event.y) != "heading":
+            return
+        variable = self.heading_variables.get(self.schedule_table.column(self.schedule_table.identify_column(event.x), "id"))
+        if variable == None:
+            return "break"
+        for index, (key, descending) in enumerate(self.sort_keys):
+            if key == variable:
+                self.sort_keys[index] = (key, not descending)
+                break
+        else:
+            self.sort_keys.append((variable, False))
+        self.__clearSchedulesTable()
+        self.controller.sortProcessedBy(self.sort_keys, top=self.page_size)
+        self.__reset_click_count()
+        self.__loadSchedules()
+        self.update()
+        return "break"
+
     def __reset_click_count(self):
         self.cohort_click_count = 0
         self.study_mode_click_count = 0
@@ -1226,11 +2807,11 @@ class App(customtkinter.CTk):
     def __cohort_clicked(self):
         self.__clearSchedulesTable()
         if self.cohort_click_count == 0: #
-            self.controller.sortProcessed("Cohort") #
+            self.__sortBy("Cohort") #
             self.__reset_click_count()
             self.cohort_click_count += 1 #
         elif self.cohort_click_count == 1: #
-            self.controller.sortProcessed("Cohort", descending=True) #
+            self.__sortBy("Cohort", descending=True) #
             self.__reset_click_count()
         self.__loadSchedules()
         self.update()
@@ -1238,11 +2819,11 @@ class App(customtkinter.CTk):
     def __study_mode_clicked(self):
         self.__clearSchedulesTable()
         if self.study_mode_click_count == 0: #
-            self.controller.sortProcessed("Study_Mode") #
+            self.__sortBy("Study_Mode") #
             self.__reset_click_count()
             self.study_mode_click_count += 1 #
         elif self.study_mode_click_count == 1: #
-            self.controller.sortProcessed("Study_Mode", descending=True) #
+            self.__sortBy("Study_Mode", descending=True) #
             self.__reset_click_count()
         self.__loadSchedules()
         self.update()
@@ -1250,11 +2831,11 @@ class App(customtkinter.CTk):
     def __lecturer_clicked(self):
         self.__clearSchedulesTable()
         if self.lecturer_click_count == 0: #
-            self.controller.sortProcessed("Lecturer") #
+            self.__sortBy("Lecturer") #
             self.__reset_click_count()
             self.lecturer_click_count += 1 #
         elif self.lecturer_click_count == 1: #
-            self.controller.sortProcessed("Lecturer", descending=True) #
+            self.__sortBy("Lecturer", descending=True) #
             self.__reset_click_count()
         self.__loadSchedules()
         self.update()
@@ -1262,11 +2843,11 @@ class App(customtkinter.CTk):
     def __module_code_clicked(self):
         self.__clearSchedulesTable()
         if self.module_code_click_count == 0: #
-            self.controller.sortProcessed("Module_Code") #
+            self.__sortBy("Module_Code") #
             self.__reset_click_count()
             self.module_code_click_count += 1 #
         elif self.module_code_click_count == 1: #
-            self.controller.sortProcessed("Module_Code", descending=True) #
+            self.__sortBy("Module_Code", descending=True) #
             self.__reset_click_count()
         self.__loadSchedules()
         self.update()
@@ -1274,11 +2855,11 @@ class App(customtkinter.CTk):
     def __description_clicked(self):
         self.__clearSchedulesTable()
         if self.description_click_count == 0: #
-            self.controller.sortProcessed("Description") #
+            self.__sortBy("Description") #
             self.__reset_click_count()
             self.description_click_count += 1 #
         elif self.description_click_count == 1: #
-            self.controller.sortProcessed("Description", descending=True) #
+            self.__sortBy("Description", descending=True) #
             self.__reset_click_count()
         self.__loadSchedules()
         self.update()
@@ -1286,11 +2867,11 @@ class App(customtkinter.CTk):
     def __date_clicked(self):
         self.__clearSchedulesTable()
         if self.date_click_count == 0: #
-            self.controller.sortProcessed("Date") #
+            self.__sortBy("Date") #
             self.__reset_click_count()
             self.date_click_count += 1 #
         elif self.date_click_count == 1: #
-            self.controller.sortProcessed("Date", descending=True) #
+            self.__sortBy("Date", descending=True) #
             self.__reset_click_count()
         self.__loadSchedules()
         self.update()
@@ -1298,11 +2879,11 @@ class App(customtkinter.CTk):
     def __day_clicked(self):
         self.__clearSchedulesTable()
         if self.day_click_count == 0: #
-            self.controller.sortProcessed("Day") #
+            self.__sortBy("Day") #
             self.__reset_click_count()
             self.day_click_count += 1 #
         elif self.day_click_count == 1: #
-            self.controller.sortProcessed("Day", descending=True) #
+            self.__sortBy("Day", descending=True) #
             self.__reset_click_count()
         self.__loadSchedules()
         self.update()
@@ -1310,11 +2891,11 @@ class App(customtkinter.CTk):
     def __start_time_clicked(self):
         self.__clearSchedulesTable()
         if self.start_time_click_count == 0: #
-            self.controller.sortProcessed("Start_Time") #
+            self.__sortBy("Start_Time") #
             self.__reset_click_count()
             self.start_time_click_count += 1 #
         elif self.start_time_click_count == 1: #
-            self.controller.sortProcessed("Start_Time", descending=True) #
+            self.__sortBy("Start_Time", descending=True) #
             self.__reset_click_count()
         self.__loadSchedules()
         self.update()
@@ -1322,11 +2903,11 @@ class App(customtkinter.CTk):
     def __end_time_clicked(self):
         self.__clearSchedulesTable()
         if self.end_time_click_count == 0: #
-            self.controller.sortProcessed("End_Time") #
+            self.__sortBy("End_Time") #
             self.__reset_click_count()
             self.end_time_click_count += 1 #
         elif self.end_time_click_count == 1: #
-            self.controller.sortProcessed("End_Time", descending=True) #
+            self.__sortBy("End_Time", descending=True) #
             self.__reset_click_count()
         self.__loadSchedules()
         self.update()
@@ -1334,11 +2915,11 @@ class App(customtkinter.CTk):
     def __duration_clicked(self):
         self.__clearSchedulesTable()
         if self.duration_click_count == 0: #
-            self.controller.sortProcessed("Duration") #
+            self.__sortBy("Duration") #
             self.__reset_click_count()
             self.duration_click_count += 1 #
         elif self.duration_click_count == 1: #
-            self.controller.sortProcessed("Duration", descending=True) #
+            self.__sortBy("Duration", descending=True) #
             self.__reset_click_count()
         self.__loadSchedules()
         self.update()
@@ -1346,11 +2927,11 @@ class App(customtkinter.CTk):
     def __class_type_clicked(self):
         self.__clearSchedulesTable()
         if self.class_type_click_count == 0: #
-            self.controller.sortProcessed("Class_Type") #
+            self.__sortBy("Class_Type") #
             self.__reset_click_count()
             self.class_type_click_count += 1 #
         elif self.class_type_click_count == 1: #
-            self.controller.sortProcessed("Class_Type", descending=True) #
+            self.__sortBy("Class_Type", descending=True) #
             self.__reset_click_count()
         self.__loadSchedules()
         self.update()
@@ -1358,11 +2939,11 @@ class App(customtkinter.CTk):
     def __location_clicked(self):
         self.__clearSchedulesTable()
         if self.location_click_count == 0: #
-            self.controller.sortProcessed("Location") #
+            self.__sortBy("Location") #
             self.__reset_click_count()
             self.location_click_count += 1 #
         elif self.location_click_count == 1: #
-            self.controller.sortProcessed("Location", descending=True) #
+            self.__sortBy("Location", descending=True) #
             self.__reset_click_count()
         self.__loadSchedules()
         self.update()
@@ -1370,11 +2951,11 @@ class App(customtkinter.CTk):
     def __size_clicked(self):
         self.__clearSchedulesTable()
         if self.size_click_count == 0: #
-            self.controller.sortProcessed("Size") #
+            self.__sortBy("Size") #
             self.__reset_click_count()
             self.size_click_count += 1 #
         elif self.size_click_count == 1: #
-            self.controller.sortProcessed("Size", descending=True) #
+            self.__sortBy("Size", descending=True) #
             self.__reset_click_count()
         self.__loadSchedules()
         self.update()
@@ -1382,11 +2963,11 @@ class App(customtkinter.CTk):
     def __zone_clicked(self):
         self.__clearSchedulesTable()
         if self.zone_click_count == 0: #
-            self.controller.sortProcessed("Zone") #
+            self.__sortBy("Zone") #
             self.__reset_click_count()
             self.zone_click_count += 1 #
         elif self.zone_click_count == 1: #
-            self.controller.sortProcessed("Zone", descending=True) #
+            self.__sortBy("Zone", descending=True) #
             self.__reset_click_count()
         self.__loadSchedules()
         self.update()
@@ -1494,6 +3075,38 @@ class App(customtkinter.CTk):
         self.end_date_option.insert(0, self.cal.get_date())
         self.date_window.destroy()
     
+    # directory watch
+    def __watchChecked(self):
+        if self.watcher != None:
+            self.after_cancel(self.watch_job)
+            self.watcher.stop()
+            self.watcher = None
+        if self.watched.get() == 1:
+            if not hasattr(self, "file_path"):
+                self.watched.set(0)
+                self.errorPopup("Import a directory first!")
+                return
+            self.watcher = DirectoryWatcher(self.file_path)
+            self.watch_job = self.after(500, self.__watch)
+
+    def __watch(self):
+        try:
+            changes = self.watcher.poll()
+            if changes == None:
+                self.handler.loadDirectory(self.file_path)
+            elif len(changes) > 0:
+                self.handler.updateFiles(self.file_path, changes)
+            if changes == None or len(changes) > 0:
+                self.__clearFilesTable()
+                self.__loadFiles()
+                # the handler is already up to date, only the options and the shown rows follow it
+                self.__syncController()
+                self.__reload_filters(keep=True)
+                self.__applyQuery()
+        finally:
+            # an error in one poll must not end the watch while the box stays checked
+            self.watch_job = self.after(500, self.__watch)
+
     # popup
     def errorPopup(self, message):
         messagebox.showerror("An error occurred", message)
@@ -1509,6 +3122,8 @@ class App(customtkinter.CTk):
         self.entry.configure(state="disabled")
         self.reloadButtonPressed()
         self.__loadFiles()
+        if self.watched.get() == 1:
+            self.__watchChecked()
         if len(self.handler.getFiles()) == 0:
             self.errorPopup("No valid CSV file found!")
         self.update()
@@ -1523,7 +3138,7 @@ class App(customtkinter.CTk):
         self.reloadButtonPressed()
 
     def exportButtonPressed(self):
-        if len(self.controller.getProcessed()) == 0:
+        if self.controller.getProcessedCount() == 0:
             self.errorPopup("No Schedules Found!")
         else:
             self.confirmButtonPressed()
@@ -1550,7 +3165,7 @@ class App(customtkinter.CTk):
             self.file_name_entry.grid(row=1, column=0, columnspan=3, padx=(5,0), pady=(5,0), sticky="we")
 
             # format option
-            self.format_set = ["pdf", "xlsx"]
+            self.format_set = ["pdf", "xlsx", "clashes"]
             self.format_option = customtkinter.CTkComboBox(self.export_window, values=self.format_set, width=70)
             self.format_option.set("pdf")
             self.format_option.grid(row=1, column=3, sticky='we', padx=5, pady=(5,0))
@@ -1575,35 +3190,83 @@ class App(customtkinter.CTk):
         self.confirmButtonPressed()
         self.errorPopup("Successfully Saved")
 
+    def freeButtonPressed(self):
+        # rooms free at the chosen dates and times, and the chosen lecturer's free time on those dates
+        if self.checked.get() == 0:
+            start_date = self.date_option.get()
+            end_date = start_date
+        else:
+            start_date = self.start_date_option.get()
+            end_date = self.end_date_option.get()
+        start_time = self.start_time_option.get()
+        end_time = self.end_time_option.get()
+        if "dd/mm/yyyy" in [start_date, end_date] or "No Filter" in [start_time, end_time]:
+            self.errorPopup("Set the date and the start and end time first!")
+            return
+        start_date = datetime.strptime(start_date, '%d/%m/%Y')
+        end_date = datetime.strptime(end_date, '%d/%m/%Y')
+        start_time = datetime.strptime(start_time, '%H:%M:%S')
+        end_time = datetime.strptime(end_time, '%H:%M:%S')
+        if end_time == start_time:
+            self.errorPopup("The end time must differ from the start time!")
+            return
+        size = None if self.size_option.get() == "No Filter" else int(self.size_option.get())
+        zone = self.__option_value(self.zone_option)
+        zone = None if zone == "No Filter" else zone
+        lecturer = self.__option_value(self.lecturer_option)
+
+        self.__syncController()
+        lines = ["Free Rooms:"]
+        for location, capacity, room_zone in self.controller.getFreeRooms(start_date, end_date, start_time, end_time, size, zone):
+            lines.append(f"{location} ({capacity}, {room_zone})")
+        if lecturer != "No Filter":
+            lines.append("")
+            lines.append(f"{lecturer} Free:")
+            for start, end in self.controller.getFreeSlots(lecturer, start_date, end_date, start_time, end_time):
+                lines.append(f"{start.strftime('%d/%m/%Y %H:%M')} ~ {end.strftime('%H:%M')}")
+        if len(lines) > 40:
+            lines = lines[:40] + [f"... {len(lines) - 40} more"]
+        messagebox.showinfo("Free Rooms", "\n".join(lines))
+
+    def __syncController(self):
+        # the column permutations are kept until the loaded schedules change
+        if self.controller.getVersion() != self.handler.getVersion():
+            self.controller = ScheduleController(self.handler)
+
     def reloadButtonPressed(self):
-        self.handler.resetHandler()
-        self.handler.loadDirectory(self.file_path)
-        self.controller = ScheduleController(self.handler)
+        # show rows as soon as their file is parsed, the handler keeps the same order
         self.__clearSchedulesTable()
-        self.__loadSchedules()
+        shown = 0
+        for schedules, progress in self.handler.iterDirectory(self.file_path):
+            self.__insertSchedules(schedules, start=shown)
+            shown += len(schedules)
+            self.title(f"Timetable Viewer ({progress.getFilesDone()}/{progress.getFilesTotal()} files, {progress.getRowsDone()} rows)")
+            self.update()
+        self.title("Timetable Viewer")
+        self.__syncController()
+        self.controller.resetProcessed()
+        self.shown_rows = shown
+        self.sort_keys = []
+        if shown == 0 and len(self.handler.getFiles()) != 0:
+            self.errorPopup("No Schedules Found!")
         self.__reload_filters()
         self.update()
 
-    def confirmButtonPressed(self, called=False):
-        self.handler.resetHandler()
-        self.handler.loadDirectory(self.file_path)
-        self.controller = ScheduleController(self.handler)
-        self.__clearSchedulesTable()
-
-
-        cohort = self.cohort_option.get()
+    def __getQuery(self):
+        # the control() filters chosen in the tabs
+        cohort = self.__option_value(self.cohort_option)
         if cohort == "No Filter":
             cohort = None
 
-        study_mode = self.study_mode_option.get()
+        study_mode = self.__option_value(self.study_mode_option)
         if study_mode == "No Filter":
             study_mode = None
 
-        lecturer = self.lecturer_option.get()
+        lecturer = self.__option_value(self.lecturer_option)
         if lecturer == "No Filter":
             lecturer = None
 
-        module_code = self.module_code_option.get()
+        module_code = self.__option_value(self.module_code_option)
         if module_code == "No Filter":
             module_code = None
 
@@ -1646,7 +3309,7 @@ class App(customtkinter.CTk):
         else:
             end_time = datetime.strptime(end_time, '%H:%M:%S')
 
-        location = self.location_option.get()
+        location = self.__option_value(self.location_option)
         if location == "No Filter":
             location = None
 
@@ -1656,11 +3319,11 @@ class App(customtkinter.CTk):
         else:
             size = int(size)
 
-        zone = self.zone_option.get()
+        zone = self.__option_value(self.zone_option)
         if zone == "No Filter":
             zone = None
 
-        description = [self.description_option.get(i) for i in self.description_option.curselection()]
+        description = sorted(self.description_selected)
         if description == []:
             description = None
         else:
@@ -1678,8 +3341,22 @@ class App(customtkinter.CTk):
         else:
             class_type = "&&&".join(class_type)
 
-        self.controller.control(sortBy="Date", Cohort=cohort, Study_Mode=study_mode, Lecturer=lecturer, Module_Code=module_code, Date=date, Start_Date=start_date, End_Date=end_date, Duration=duration, Start_Time=start_time, End_Time=end_time, Location=location, Size=size, Zone=zone, Description=description, Day_str=day, Class_Type=class_type)
+        clash = None
+        if self.clashed.get() == 1:
+            clash = "Location&&&Lecturer"
+
+        return dict(Cohort=cohort, Study_Mode=study_mode, Lecturer=lecturer, Module_Code=module_code, Date=date, Start_Date=start_date, End_Date=end_date, Duration=duration, Start_Time=start_time, End_Time=end_time, Location=location, Size=size, Zone=zone, Description=description, Day_str=day, Class_Type=class_type, Clash=clash)
+
+    def confirmButtonPressed(self, called=False):
+        self.handler.loadDirectory(self.file_path)
+        self.__applyQuery()
+
+    def __applyQuery(self):
+        self.__syncController()
+        self.__clearSchedulesTable()
 
+        self.controller.control(sortBy="Date", top=self.page_size, **self.__getQuery())
+        self.sort_keys = [("Date", False)]
 
         self.__loadSchedules()
         self.update()